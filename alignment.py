@@ -3,16 +3,166 @@ from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
 import time
 import random
+import threading
+import os
+import numpy as np
+from collections import deque
+
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Configured NLI models by short name; any other Hugging Face model name can be passed as well.
+# The smaller ones trade some agreement with mDeBERTa for throughput (see benchmark_alignment.py --models).
+NLI_MODELS = {
+    "mdeberta-base": "MoritzLaurer/mDeBERTa-v3-base-mnli-xnli",  # Reference model, multilingual
+    "minilm-l12": "MoritzLaurer/multilingual-MiniLMv2-L12-mnli-xnli",  # Multilingual, distilled
+    "minilm-l6": "MoritzLaurer/multilingual-MiniLMv2-L6-mnli-xnli",  # Multilingual, distilled, fastest
+    "deberta-xsmall": "cross-encoder/nli-deberta-v3-xsmall",  # English only
+}
+LABELS = ("ENTAILMENT", "NEUTRAL", "CONTRADICTION")  # Label IDs used throughout the pipeline
+
+
+def label_columns(id2label):
+    """
+    Map a model's output columns to our label IDs from its config.id2label: returns, for
+    ENTAILMENT, NEUTRAL and CONTRADICTION, the output column holding it (or None). Binary
+    models' "not_entailment" counts as NEUTRAL. Unnamed labels (LABEL_0, ...) keep the
+    mDeBERTa order.
+    """
+    by_name = {str(name).lower().replace("-", "_"): int(i) for i, name in (id2label or {}).items()}
+    columns = [by_name.get("entailment"), by_name.get("neutral", by_name.get("not_entailment")),
+               by_name.get("contradiction")]
+    if columns[0] is None:
+        print(f"Unknown label names {list(by_name)}, assuming the order {LABELS}.")
+        return [0, 1, 2]
+    return columns
+
+
+def load_onnx_model(model_name, quantize=False, cache_dir="cache/onnx"):
+    """
+    Export `model_name` to ONNX on first use (and, with quantize=True, a copy with dynamic int8
+    weights), then load it with ONNX Runtime. Exports are kept under cache_dir and reused.
+    """
+    from optimum.onnxruntime import ORTModelForSequenceClassification  # Optional dependency, only needed for these backends
+
+    export_dir = os.path.join(cache_dir, model_name.replace("/", "__"))
+    file_name = "model.onnx"
+    if not os.path.exists(os.path.join(export_dir, file_name)):
+        print(f"Exporting {model_name} to ONNX in {export_dir}...")
+        ORTModelForSequenceClassification.from_pretrained(model_name, export=True).save_pretrained(export_dir)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantized_name = "model_int8.onnx"
+        if not os.path.exists(os.path.join(export_dir, quantized_name)):
+            print(f"Quantizing {model_name} to int8...")
+            quantize_dynamic(os.path.join(export_dir, file_name), os.path.join(export_dir, quantized_name),
+                             weight_type=QuantType.QInt8)
+        file_name = quantized_name
+
+    return ORTModelForSequenceClassification.from_pretrained(export_dir, file_name=file_name)
+
+
+def available_cores():
+    """CPU cores this process may run on (respects affinity masks, container CPU sets and cgroup v2 CPU quotas)."""
+    n_cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as file:
+            quota, period = file.read().split()[:2]
+        if quota != "max":
+            n_cores = min(n_cores, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return n_cores
+
+
+def configure_cpu_threads(n_threads=None, workers=1):
+    """
+    Set PyTorch's intra-op threads (one matrix multiplication split over cores) to n_threads,
+    by default the available cores divided between the `workers` threads that run inference
+    side by side, and its inter-op threads to 1: a forward pass of one batch has no
+    independent operators worth running side by side, and extra pools only oversubscribe
+    the cores. The settings are process-wide. Returns the number of intra-op threads.
+    """
+    n_threads = n_threads or max(1, available_cores() // workers)
+    torch.set_num_threads(n_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Can only be set once per process, before any inter-op parallel work
+    return n_threads
+
+
+def cpu_supports_bf16():
+    """True if oneDNN has fast bfloat16 kernels on this CPU (AVX512-BF16 or AMX)."""
+    try:
+        return torch.ops.mkldnn._is_mkldnn_bf16_supported()
+    except (AttributeError, RuntimeError):
+        return False
 
 
 class AlignmentModel:
-    def __init__(self, batch_size=4, model_name="MoritzLaurer/mDeBERTa-v3-base-mnli-xnli"):
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.batch_size = 16 if torch.cuda.is_available() else batch_size
+    def __init__(self, batch_size=None, model_name="MoritzLaurer/mDeBERTa-v3-base-mnli-xnli", device=None,
+                 max_batch_tokens=None, backend="torch", cache=None, cpu_threads=None, cpu_workers=1,
+                 compile=False, bf16=False):
+        """
+        backend: "torch" runs the model in eager PyTorch; "onnx" runs an ONNX export through ONNX Runtime
+        and "onnx-int8" the same export with dynamically quantized int8 weights (CPU only, needs
+        `pip install optimum[onnxruntime]`).
+        cache: optional PredictionCache consulted by batch_predict before running the model.
+        cpu_threads: opt-in PyTorch thread tuning on CPU (see configure_cpu_threads): a number of intra-op
+        threads, or "auto" to split the available cores between cpu_workers concurrent inference threads.
+        None leaves PyTorch's thread settings alone.
+        compile: wrap the PyTorch model with torch.compile (dynamic shapes, first batches are slow).
+        bf16: run the PyTorch model under bfloat16 autocast on CPU; "auto" enables it only when
+        the CPU has native bf16 support. Labels can differ slightly from float32.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Choose from {list(BACKENDS)}.")
+        model_name = NLI_MODELS.get(model_name, model_name)
+        self.model_name = model_name
+        self.backend = backend
+        self.cache = cache
+        self.cache_model_key = f"{model_name}|{backend}"  # Quantized backends give slightly different outputs
+        if backend == "torch":
+            self.device = torch.device(device or ("cuda" if torch.cuda.is_available() else "cpu"))
+        else:
+            self.device = torch.device("cpu")
+        self.cpu_threads = None
+        if self.device.type == "cpu" and cpu_threads is not None:
+            self.cpu_threads = configure_cpu_threads(None if cpu_threads == "auto" else cpu_threads, cpu_workers)
+        self.bf16 = backend == "torch" and self.device.type == "cpu" and (cpu_supports_bf16() if bf16 == "auto" else bool(bf16))
+        if self.bf16:
+            self.cache_model_key += "|bf16"
+        self.batch_times = deque(maxlen=10000)  # Seconds per forward pass of the latest batches
+
+        # Batches are built from length-sorted pairs under a budget of padded tokens, so short tweets
+        # go in large batches and long ones in small batches. Both limits scale with the host.
+        n_cores = self.cpu_threads or available_cores()
+        if self.device.type == "cuda":
+            self.batch_size = batch_size or 64
+            self.max_batch_tokens = max_batch_tokens or 32768
+        else:
+            self.batch_size = batch_size or max(4, min(32, 2 * n_cores))
+            self.max_batch_tokens = max_batch_tokens or max(1024, min(8192, 256 * n_cores))
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(model_name).to(self.device)
+        if backend == "torch":
+            self.model = AutoModelForSequenceClassification.from_pretrained(model_name).to(self.device)
+            self.model.eval()
+        else:
+            # Same call signature as the PyTorch model: takes the tokenizer's tensors, returns .logits
+            self.model = load_onnx_model(model_name, quantize=backend == "onnx-int8")
+        # Different models use different label orders: reorder their outputs to self.labels
+        columns = label_columns(self.model.config.id2label)
+        self.label_index = torch.tensor([self.model.config.num_labels if c is None else c for c in columns],
+                                        device=self.device)
+        if backend == "torch" and compile:
+            self.model = torch.compile(self.model, dynamic=True)
+        # Fast tokenizers are not safe to call from several threads at once, and the model is
+        # shared between requests through model_registry
+        self.tokenizer_lock = threading.Lock()
 
-        # Different models use different label orders, so be sure to use the correct mapping
+        # Label IDs returned by every model (their outputs are mapped to this order)
         self.labels = {
             0: 'ENTAILMENT',
             1: 'NEUTRAL',
@@ -21,51 +171,198 @@ class AlignmentModel:
 
     def predict(self, original_claim, claim_to_review, verbose=False):
         """ Compare a single tweet against a claim. Returns label ID. """
-        input = self.tokenizer(claim_to_review, original_claim, truncation=True, return_tensors="pt").to(self.device)
-        logits = self.model(**input).logits[0]
-        probs = torch.nn.functional.softmax(logits, dim=-1).tolist()
+        with self.tokenizer_lock:
+            input = self.tokenizer(claim_to_review, original_claim, truncation=True, return_tensors="pt").to(self.device)
+        with torch.inference_mode():
+            logits = self.model(**input).logits.float()
+        labels, probs = self._to_labels(logits)
+        probs = probs[0].tolist()
         if verbose:
             print(f'Comparing "{claim_to_review}" against "{original_claim}":')
             for label, prob in zip(self.labels.values(), probs):
                 print(f'    {label}: {prob:.3f}')
 
-        label = torch.argmax(logits, dim=-1).item()
+        label = labels[0]
         if verbose:
             print(f'    => {self.labels[label]}')
         return label
     
-    def batch_predict(self, original_claim, tweets, verbose=False):
+    def _to_labels(self, logits):
+        """Label IDs and class probabilities (in self.labels order) from a batch of the model's logits."""
+        probs = torch.nn.functional.softmax(logits, dim=-1)
+        # Extra zero column for labels the model does not have (e.g. CONTRADICTION in binary models)
+        probs = torch.cat([probs, probs.new_zeros(len(probs), 1)], dim=-1)[:, self.label_index]
+        # Softmax preserves the order, so this is also the argmax of the logits
+        return torch.argmax(probs, dim=-1).tolist(), probs
+
+    def _length_batches(self, lengths):
         """
-        Compare many tweets against a claim in batches.
-        Returns list of label IDs in same order as input tweets.
+        Group input indices into batches: indices are sorted by token length and a batch grows
+        while its padded size (n_pairs * longest pair) stays within max_batch_tokens and it has
+        at most batch_size pairs.
+        """
+        batches, batch = [], []
+        for i in sorted(range(len(lengths)), key=lengths.__getitem__):
+            # Sorted ascending, so lengths[i] is the longest pair of the batch if i is added
+            if batch and ((len(batch) + 1) * lengths[i] > self.max_batch_tokens or len(batch) >= self.batch_size):
+                batches.append(batch)
+                batch = []
+            batch.append(i)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _run_batches(self, lengths, features_for):
+        """
+        Run the model over inputs 0..len(lengths)-1 in length-bucketed batches. `features_for(i)`
+        returns the unpadded encoding of input i. Returns (labels, probs) in input order.
+        """
+        labels, probs = [None] * len(lengths), [None] * len(lengths)
+        for batch in self._length_batches(lengths):
+            features = [features_for(i) for i in batch]
+            with self.tokenizer_lock:
+                inputs = self.tokenizer.pad(features, return_tensors="pt").to(self.device)
+
+            start_time = time.perf_counter()
+            with torch.inference_mode(), torch.autocast("cpu", dtype=torch.bfloat16, enabled=self.bf16):
+                logits = self.model(**inputs).logits.float()
+            self.batch_times.append(time.perf_counter() - start_time)
+            batch_labels, batch_probs = self._to_labels(logits)
+
+            # Scatter back to the input order
+            for i, label, label_probs in zip(batch, batch_labels, batch_probs.tolist()):
+                labels[i] = label
+                probs[i] = label_probs
+        return labels, probs
+
+    def _predict_proba(self, claims, texts):
+        """
+        Run the model on (text, claim) pairs in length-bucketed batches; the pairs may belong to
+        different claims. Returns (labels, probs) in input order.
+        """
+        with self.tokenizer_lock:
+            # Tokenize without padding: padding is added per batch, to the batch's longest pair
+            encodings = self.tokenizer(texts, claims, truncation=True)
+        lengths = [len(ids) for ids in encodings["input_ids"]]
+        return self._run_batches(lengths, lambda i: {key: encodings[key][i] for key in encodings.keys()})
+
+    def predict_pairs_proba(self, claims, texts):
+        """
+        Classify (claims[i], texts[i]) pairs, which may mix several claims, in shared batches.
+        With a prediction cache, only the pairs missing from it are sent to the model.
+        Returns (label IDs, class probabilities, number of pairs taken from the cache).
+        """
+        labels, probs = [None] * len(texts), [None] * len(texts)
+        if self.cache is not None:
+            by_claim = {}
+            for i, claim in enumerate(claims):
+                by_claim.setdefault(claim, []).append(i)
+            for claim, indices in by_claim.items():
+                hits = self.cache.get_many(self.cache_model_key, claim, [texts[i] for i in indices])
+                for j, (label, label_probs) in hits.items():
+                    labels[indices[j]] = label
+                    probs[indices[j]] = label_probs
+
+        misses = [i for i, label in enumerate(labels) if label is None]
+        if misses:
+            miss_labels, miss_probs = self._predict_proba([claims[i] for i in misses], [texts[i] for i in misses])
+            for i, label, label_probs in zip(misses, miss_labels, miss_probs):
+                labels[i] = label
+                probs[i] = label_probs
+            if self.cache is not None:
+                new_by_claim = {}
+                for i in misses:
+                    new_by_claim.setdefault(claims[i], []).append(i)
+                for claim, indices in new_by_claim.items():
+                    self.cache.put_many(self.cache_model_key, claim, [texts[i] for i in indices],
+                                        [labels[i] for i in indices], [probs[i] for i in indices])
+
+        return labels, probs, len(texts) - len(misses)
+
+    def batch_predict_proba(self, original_claim, tweets, verbose=False):
+        """
+        Compare many tweets against a claim in length-bucketed batches.
+        Returns (label IDs, class probabilities) in same order as input tweets. With a
+        prediction cache, only the pairs missing from it are sent to the model.
         """
         if verbose:
             print(f'Batch comparing {len(tweets)} tweets against "{original_claim}" using {self.device}:')
-            
-        results = []
-        for i in range(0, len(tweets), self.batch_size):
-            batch_texts = [t['text'] for t in tweets[i:i+self.batch_size]]
-            # Tokenize all pairs in the batch
-            inputs = self.tokenizer(
-                batch_texts,
-                [original_claim] * len(batch_texts),
-                truncation=True,
-                padding=True,
-                return_tensors="pt"
-            ).to(self.device)
+        if not tweets:
+            return [], []
+
+        texts = [t['text'] for t in tweets]
+        labels, probs, n_cached = self.predict_pairs_proba([original_claim] * len(texts), texts)
+
+        if verbose:
+            if self.cache is not None:
+                print(f'{n_cached} predictions taken from the cache, {len(texts) - n_cached} computed.')
+            for txt, label_id in zip(texts, labels):
+                print(f'"{txt}" => {self.labels[label_id]}')
+
+        return labels, probs
+
+    def batch_predict_matrix(self, claims, tweets, verbose=False):
+        """
+        Score every claim against every tweet, e.g. a list of claims over a shared tweet pool.
+        Each distinct claim and each tweet is tokenized once; the pair encodings are assembled
+        from those token ids and all pairs share the same length-bucketed batches. Pairs found
+        in the prediction cache are not recomputed.
+        Returns (labels, probs): arrays of shape (n_claims, n_tweets) and (n_claims, n_tweets, n_labels).
+        """
+        texts = [t['text'] for t in tweets]
+        labels = np.full((len(claims), len(texts)), -1, dtype=np.int64)
+        probs = np.zeros((len(claims), len(texts), len(self.labels)), dtype=np.float32)
+        if not claims or not texts:
+            return labels, probs
+
+        missing = []  # (claim index, tweet index) of the pairs to compute
+        for c, claim in enumerate(claims):
+            hits = self.cache.get_many(self.cache_model_key, claim, texts) if self.cache is not None else {}
+            for t, (label, label_probs) in hits.items():
+                labels[c, t] = label
+                probs[c, t] = label_probs
+            missing.extend((c, t) for t in range(len(texts)) if t not in hits)
+        if verbose:
+            print(f'Scoring {len(claims)} claims x {len(texts)} tweets using {self.device}: '
+                  f'{len(claims) * len(texts) - len(missing)} pairs cached, {len(missing)} to compute.')
+
+        if missing:
+            distinct_claims = list(dict.fromkeys(claims))
+            with self.tokenizer_lock:
+                text_ids = self.tokenizer(texts, add_special_tokens=False)["input_ids"]
+                claim_ids = dict(zip(distinct_claims,
+                                     self.tokenizer(distinct_claims, add_special_tokens=False)["input_ids"]))
+                n_special = self.tokenizer.num_special_tokens_to_add(pair=True)
+            max_length = min(self.tokenizer.model_max_length, 4096)
 
-            with torch.no_grad():
-                logits = self.model(**inputs).logits
-            probs = torch.nn.functional.softmax(logits, dim=-1)
-            labels = torch.argmax(probs, dim=-1).tolist()
+            def features_for(i):
+                c, t = missing[i]
+                # Same pair encoding as tokenizer(text, claim, truncation=True)
+                return self.tokenizer.prepare_for_model(text_ids[t], claim_ids[claims[c]], truncation=True,
+                                                        max_length=max_length)
 
-            results.extend(labels)
+            lengths = [min(len(text_ids[t]) + len(claim_ids[claims[c]]) + n_special, max_length) for c, t in missing]
+            new_labels, new_probs = self._run_batches(lengths, features_for)
+            for (c, t), label, label_probs in zip(missing, new_labels, new_probs):
+                labels[c, t] = label
+                probs[c, t] = label_probs
 
-            if verbose:
-                for txt, label_id in zip(batch_texts, labels):
-                    print(f'"{txt}" => {self.labels[label_id]}')
+            if self.cache is not None:
+                computed = {}
+                for c, t in missing:
+                    computed.setdefault(c, []).append(t)
+                for c, indices in computed.items():
+                    self.cache.put_many(self.cache_model_key, claims[c], [texts[t] for t in indices],
+                                        labels[c, indices].tolist(), probs[c, indices].tolist())
 
-        return results
+        return labels, probs
+
+    def batch_predict(self, original_claim, tweets, verbose=False):
+        """
+        Compare many tweets against a claim in batches.
+        Returns list of label IDs in same order as input tweets.
+        """
+        return self.batch_predict_proba(original_claim, tweets, verbose)[0]
 
 
     def filter_tweets(self, original_claim, tweets, verbose=False):
@@ -79,12 +376,82 @@ class AlignmentModel:
         tweets = [tweet for tweet, label in zip(tweets, labels) if self.labels[label] == 'ENTAILMENT']
         return tweets
 
+    def find_first_entailing(self, original_claim, tweets, lookahead=2, verbose=False):
+        """
+        Classify tweets in the given order (oldest first) and stop at the first ENTAILMENT.
+        Tweets are classified `lookahead` batches at a time, so the model still gets full
+        batches while at most (lookahead * batch_size - 1) tweets are classified needlessly.
+        Returns (index of the first entailing tweet or None, labels and probabilities of the
+        tweets classified so far).
+        """
+        chunk_size = self.batch_size * max(1, lookahead)
+        labels, probs = [], []
+        for i in range(0, len(tweets), chunk_size):
+            chunk_labels, chunk_probs = self.batch_predict_proba(original_claim, tweets[i:i+chunk_size], verbose)
+            labels.extend(chunk_labels)
+            probs.extend(chunk_probs)
+            for j, label in enumerate(chunk_labels):
+                if self.labels[label] == 'ENTAILMENT':
+                    return i + j, labels, probs
+        return None, labels, probs
+
     def find_first(self, tweets):
         """ Find the earliest tweet """
         tweets = sorted(tweets, key=lambda tweet: tweet['created_at_datetime'])
         return tweets[0]
     
 
+class CascadeAlignmentModel:
+    """
+    Two-stage classifier: a small screen model labels every pair, and only the pairs it is
+    unsure about (top probability below `confidence`) or, with verify_entailment, that it
+    labels ENTAILMENT go to the full model. Exposes the same prediction methods as
+    AlignmentModel, so SourceFinder can use either.
+    """
+
+    def __init__(self, screen, full, confidence=0.9, verify_entailment=True):
+        self.screen = screen  # Small AlignmentModel, e.g. NLI_MODELS["minilm-l6"]
+        self.full = full  # Reference AlignmentModel (mDeBERTa)
+        self.confidence = confidence  # Screen probability needed to keep its label
+        self.verify_entailment = verify_entailment  # Always confirm ENTAILMENT (it decides the source) with the full model
+        self.labels = full.labels
+        self.device = full.device
+        self.batch_size = full.batch_size
+        self.model_name = f"{screen.model_name} -> {full.model_name}"
+        self.cache = None  # Both stages use their own prediction cache
+        self.n_pairs = 0
+        self.n_escalated = 0
+
+    def predict_pairs_proba(self, claims, texts):
+        """Same as AlignmentModel.predict_pairs_proba, escalating uncertain pairs to the full model."""
+        labels, probs, _ = self.screen.predict_pairs_proba(claims, texts)
+        escalate = [i for i, (label, label_probs) in enumerate(zip(labels, probs))
+                    if max(label_probs) < self.confidence or (self.verify_entailment and label == 0)]
+        if escalate:
+            full_labels, full_probs, _ = self.full.predict_pairs_proba([claims[i] for i in escalate],
+                                                                      [texts[i] for i in escalate])
+            for i, label, label_probs in zip(escalate, full_labels, full_probs):
+                labels[i] = label
+                probs[i] = label_probs
+        self.n_pairs += len(texts)
+        self.n_escalated += len(escalate)
+        return labels, probs, 0
+
+    def stats(self):
+        return {
+            "pairs": self.n_pairs,
+            "escalated": self.n_escalated,
+            "escalated_ratio": round(self.n_escalated / self.n_pairs, 3) if self.n_pairs else 0.0,
+        }
+
+    # Everything else is built on predict_pairs_proba, exactly as in AlignmentModel
+    batch_predict_proba = AlignmentModel.batch_predict_proba
+    batch_predict = AlignmentModel.batch_predict
+    batch_filter_tweets = AlignmentModel.batch_filter_tweets
+    find_first_entailing = AlignmentModel.find_first_entailing
+    find_first = AlignmentModel.find_first
+
+
 if __name__ == "__main__":
     #model = AlignmentModel()
     #claim = "Climate change is just caused by natural cycles of the sun"
@@ -1,4 +1,6 @@
 import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.wsgi import WSGIMiddleware
@@ -9,12 +11,42 @@ import pandas as pd
 from visualization.app import create_app
 from typing import List, Set, Optional
 from query_builder_synonyms import SynonymQueryBuilder
+import model_registry
+from inference_server import InferenceServer
 
 # Import backend pipeline
 from source_finder_nitter import SourceFinder
 
 app = FastAPI(title="Climate Disinformation Detector API")
 
+# CPU-heavy stages (KeyBERT, spaCy, NLI inference) run in this pool so the event loop keeps serving
+# other requests, static files and Playwright I/O. Threads share the loaded models, and PyTorch
+# releases the GIL during inference. Size it with the INFERENCE_WORKERS environment variable.
+inference_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("INFERENCE_WORKERS", "2")),
+    thread_name_prefix="inference",
+)
+
+# One alignment model for all requests: concurrent analyses submit their tweets here and are
+# classified together in shared batches
+inference_server = InferenceServer(
+    max_batch_pairs=int(os.environ.get("INFERENCE_MAX_BATCH", "256")),
+    max_latency=float(os.environ.get("INFERENCE_MAX_LATENCY", "0.02")),
+    executor=inference_executor,
+)
+
+@app.on_event("startup")
+async def warmup_models():
+    # Load the NLI, KeyBERT and spaCy models before the first request (WARMUP_MODELS=1)
+    if os.environ.get("WARMUP_MODELS", "0") == "1":
+        await asyncio.get_running_loop().run_in_executor(inference_executor, model_registry.warmup)
+        await inference_server.start()
+
+@app.on_event("shutdown")
+async def shutdown_inference_executor():
+    await inference_server.stop()
+    inference_executor.shutdown(wait=False, cancel_futures=True)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"], 
@@ -43,6 +75,12 @@ class AnalyzeRequest(BaseModel):
     selected_synonyms: dict = {}
     keywords: Optional[list] = []
     earliest_k: int = 0
+    search: str = "linear"  # "linear" (scan year by year) or "bisect" (probe for the earliest tweets first)
+    early_exit: bool = False  # Stop classifying a window at its first entailing tweet
+    prefilter_threshold: Optional[float] = None  # Cosine similarity to the claim a tweet needs to reach NLI
+    dedup_threshold: Optional[float] = None  # Similarity at which tweets share one classification (e.g. 0.9), None to classify every tweet
+    nli_model: Optional[str] = None  # NLI model name or alias (alignment.NLI_MODELS), None for the default mDeBERTa
+    screen_model: Optional[str] = None  # Small NLI model screening tweets before nli_model, None for no cascade
 
 # Request schema for visualization
 class VisualizationRequest(BaseModel):
@@ -62,6 +100,13 @@ async def analyze(req: AnalyzeRequest):
             max_keywords=req.max_keywords,
             n_keywords_dropped=req.n_keywords_dropped,
             excludes=req.excludes,
+            executor=inference_executor,
+            # The shared server runs the default model; other model choices are run by the request itself
+            inference=inference_server if req.nli_model is None and req.screen_model is None else None,
+            nli_model=req.nli_model or model_registry.DEFAULT_ALIGNMENT_MODEL,
+            screen_model=req.screen_model,
+            prefilter_threshold=req.prefilter_threshold,
+            dedup_threshold=req.dedup_threshold,
         )
 
         if req.mode == "find_source":
@@ -77,6 +122,8 @@ async def analyze(req: AnalyzeRequest):
                 user_choices=req.selected_synonyms,
                 keywords=req.keywords,
                 earliest_k=req.earliest_k,
+                search=req.search,
+                early_exit=req.early_exit,
             )
         elif req.mode == "find_all":
             file_name, tweet_list = await source_finder.find_all(
@@ -121,21 +168,29 @@ async def get_synonyms(request: Request):
     claim = data["text"]
     params = data.get("params", {})
 
-    builder = SynonymQueryBuilder(
-        sentence=claim,
-        max_keywords=params.get("max_keywords", 5),
-        n_keywords_dropped=params.get("n_keywords_dropped", 1),
-        model_name=params.get("model_name", "en_core_web_md"),
-        top_n_syns=params.get("top_n_syns", 5),
-        threshold=params.get("threshold", 0.1),
-        max_syns_per_kw=params.get("max_syns_per_kw", 2)
-    )
-
-    synonyms = builder.get_contextual_synonyms()
+    def build_synonyms():
+        builder = SynonymQueryBuilder(
+            sentence=claim,
+            max_keywords=params.get("max_keywords", 5),
+            n_keywords_dropped=params.get("n_keywords_dropped", 1),
+            model_name=params.get("model_name", "en_core_web_md"),
+            top_n_syns=params.get("top_n_syns", 5),
+            threshold=params.get("threshold", 0.1),
+            max_syns_per_kw=params.get("max_syns_per_kw", 2)
+        )
+        return builder, builder.get_contextual_synonyms()
+
+    # KeyBERT and spaCy are CPU-bound, keep them off the event loop
+    builder, synonyms = await asyncio.get_running_loop().run_in_executor(inference_executor, build_synonyms)
     builders[claim] = builder  # store to use later for query building
 
     return {"keywords": builder.keywords, "synonyms": synonyms}
 
+# Seconds spent loading each model in this process, and batching statistics of the inference server
+@app.get("/api/models")
+def loaded_models():
+    return {"load_times": model_registry.load_times(), "inference": inference_server.stats()}
+
 # Root endpoint serves the frontend
 @app.get("/")
 def root():
@@ -15,6 +15,7 @@ import csv
 import asyncio
 import time
 from source_finder_nitter import SourceFinder
+from model_registry import get_keyword_service
 
 # Suppress other warnings from imported AI models
 import warnings
@@ -121,6 +122,11 @@ async def main():
 
     print(f"\n{len(pending_claims)} new claims to process...\n")
 
+    # Extract the keywords of all pending claims up front in batched passes; SourceFinder then reuses them
+    start_time = time.time()
+    get_keyword_service().extract_keywords(pending_claims, top_n=max_keywords)
+    print(f"Extracted the keywords of {len(pending_claims)} claims in {time.time() - start_time:.2f} s\n")
+
     # Open CSV in append mode
     write_header = not os.path.exists(filename) or os.path.getsize(filename) == 0
     with open(filename, "a", newline="", encoding="utf-8") as f:
@@ -0,0 +1,275 @@
+"""
+Agreement check and throughput benchmark for the AlignmentModel inference backends.
+
+Replays recorded tweet sets (CSVs written by find_all/predict_alignment, see results/)
+against the claim each set was collected for. Every backend in alignment.BACKENDS labels
+the same tweets; the script reports how often its labels agree with the reference eager
+PyTorch backend and how many tweets per second it classifies. It then reports, for a
+few thresholds of the embedding prefilter (prefilter.py), how many tweets it would skip
+and how many of the reference ENTAILMENT labels it would keep (recall). Finally it scores
+every claim against the pooled tweets of all sets with batch_predict_matrix and compares
+it with one batch_predict call per claim.
+
+With --runtime it instead runs a micro-benchmark of the PyTorch CPU runtime settings
+(thread counts, torch.compile, bf16 autocast), reporting tweets/s and the p50/p95
+latency of a forward pass per batch.
+
+With --models it evaluates the smaller NLI models in alignment.NLI_MODELS and the
+screen -> mDeBERTa cascades: every recorded set is replayed against its claim and every
+claim in list_of_claims.txt against a sample of the pooled recorded tweets. For each
+model it reports throughput, label agreement with mDeBERTa and the precision and recall
+of its ENTAILMENT labels (the ones that decide the source), plus the escalation rate of
+each cascade.
+"""
+
+import csv
+import html
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from alignment import AlignmentModel, BACKENDS, CascadeAlignmentModel, available_cores
+
+
+##################################################
+################# PARAMETERS #####################
+##################################################
+
+results_dir = "results"            # Directory with the recorded tweet sets
+recorded_sets = {                  # CSV file -> claim its tweets were collected for
+    "Electric_cars_worse_n_1__to_.csv": "Electric vehicles are actually worse for environment than gas cars",
+    "climate_change_natural_cycle_Earth_warmed_cooled.csv": "Climate change is just a natural cycle - the Earth has always warmed and cooled",
+    "73_plant_carbon_diets_reduce_kpc_4_2006-03-21_to_2025-09-30.csv": "New study shows plant-based diets reduce carbon footprint by 73%",
+    "climate_caused_sun_natural_cycles_kpc_5_2006-03-21_to_2025-10-11_with_syns.csv": "Climate change is just caused by natural cycles of the sun",
+}
+max_tweets_per_set = 500           # Tweets replayed per set, None for all
+backends = list(BACKENDS)          # Backends to compare
+reference = "torch"                # Backend the others are compared to
+prefilter_thresholds = [0.2, 0.3, 0.4, 0.5]  # Embedding prefilter thresholds to evaluate, [] to skip
+matrix_benchmark = True            # Compare multi-claim scoring with per-claim scoring on the pooled tweets
+runtime_settings = {               # Name -> AlignmentModel arguments for the --runtime micro-benchmark
+    "default threads": {},
+    "1 thread": {"cpu_threads": 1},
+    "all cores": {"cpu_threads": "auto"},
+    "all cores + compile": {"cpu_threads": "auto", "compile": True},
+    "all cores + bf16": {"cpu_threads": "auto", "bf16": True},
+}
+runtime_repeats = 3                # Passes over the tweets per runtime setting
+claims_file = "list_of_claims.txt"  # Claims replayed by --models against the pooled recorded tweets
+tweets_per_claim = 100             # Pooled tweets sampled for each claim of claims_file
+eval_models = ["minilm-l6", "minilm-l12", "deberta-xsmall"]  # NLI models compared with mDeBERTa by --models
+eval_cascades = [("minilm-l6", 0.9), ("minilm-l6", 0.8), ("minilm-l12", 0.9)]  # (screen model, confidence)
+
+
+##################################################
+##################### MAIN #######################
+##################################################
+
+def load_tweet_set(path, limit=None):
+    """Read the tweets of a recorded CSV as [{"text": ...}], whichever column layout it uses."""
+    tweets = []
+    with open(path, encoding="utf-8", newline="") as file:
+        for row in csv.DictReader(file):
+            text = html.unescape((row.get("text") or row.get("content") or "").strip().strip('"'))
+            if text:
+                tweets.append({"text": text})
+            if limit is not None and len(tweets) >= limit:
+                break
+    return tweets
+
+
+def load_recorded_sets():
+    sets = []
+    for file_name, claim in recorded_sets.items():
+        path = Path(results_dir) / file_name
+        if path.exists():
+            sets.append((claim, load_tweet_set(path, max_tweets_per_set)))
+        else:
+            print(f"Skipping missing tweet set {path}")
+    return sets
+
+
+def run_backend(model, sets):
+    """Label every set with `model`. Returns (labels per set, seconds spent classifying)."""
+    model.batch_predict(sets[0][0], sets[0][1][:8])  # Warm up (lazy initialisation, first allocations)
+    start_time = time.perf_counter()
+    labels = [model.batch_predict(claim, tweets) for claim, tweets in sets]
+    return labels, time.perf_counter() - start_time
+
+
+def report_prefilter(sets, reference_labels):
+    """Skipped share and recall of the reference ENTAILMENT labels for each prefilter threshold."""
+    from prefilter import EmbeddingPrefilter, recall_against_nli
+
+    prefilter = EmbeddingPrefilter()
+    start_time = time.perf_counter()
+    similarities = [s for claim, tweets in sets for s in prefilter.similarities(claim, tweets).tolist()]
+    elapsed = time.perf_counter() - start_time
+    n_entailing = sum(label == 0 for label in reference_labels)
+    print(f"\nEmbedding prefilter: {len(similarities) / elapsed:.1f} tweets/s, "
+          f"{n_entailing} tweets labeled ENTAILMENT by {reference}")
+    for threshold in prefilter_thresholds:
+        recall, skipped = recall_against_nli(similarities, reference_labels, threshold)
+        print(f"[threshold {threshold:.2f}] skips {100 * skipped:5.1f}% of tweets, recall of entailments {100 * recall:5.1f}%")
+
+
+def report_matrix(sets):
+    """Claims x pooled tweets: one batch_predict_matrix call against one batch_predict call per claim."""
+    model = AlignmentModel(backend=reference)
+    claims = [claim for claim, _ in sets]
+    pool = [tweet for _, tweets in sets for tweet in tweets]
+    n_pairs = len(claims) * len(pool)
+
+    start_time = time.perf_counter()
+    matrix_labels, _ = model.batch_predict_matrix(claims, pool)
+    matrix_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    loop_labels = [model.batch_predict(claim, pool) for claim in claims]
+    loop_time = time.perf_counter() - start_time
+
+    agreement = (matrix_labels == np.asarray(loop_labels)).mean()
+    print(f"\n{len(claims)} claims x {len(pool)} pooled tweets ({n_pairs} pairs)")
+    print(f"[batch_predict_matrix] {n_pairs / matrix_time:8.1f} pairs/s")
+    print(f"[batch_predict loop  ] {n_pairs / loop_time:8.1f} pairs/s  agreement: {100 * agreement:.2f}%")
+
+
+def benchmark_runtime(sets):
+    """Tweets/s and per-batch forward latency of each runtime setting, with labels checked against the first."""
+    print(f"{available_cores()} cores available\n")
+    expected = None
+    for name, kwargs in runtime_settings.items():
+        try:
+            model = AlignmentModel(**kwargs)
+        except Exception as e:
+            print(f"[{name}] unavailable: {e}")
+            continue
+        labels, _ = run_backend(model, sets)  # Also warms up (torch.compile traces on the first batches)
+        model.batch_times.clear()
+        start_time = time.perf_counter()
+        for _ in range(runtime_repeats):
+            for claim, tweets in sets:
+                model.batch_predict(claim, tweets)
+        elapsed = time.perf_counter() - start_time
+
+        flat = [label for set_labels in labels for label in set_labels]
+        expected = expected or flat
+        agreement = sum(a == b for a, b in zip(flat, expected)) / len(flat)
+        n_tweets = runtime_repeats * len(flat)
+        p50, p95 = np.percentile(np.asarray(model.batch_times) * 1000, [50, 95])
+        print(f"[{name:>20}] {n_tweets / elapsed:8.1f} tweets/s  batch p50 {p50:7.1f} ms  p95 {p95:7.1f} ms"
+              f"  ({model.cpu_threads or 'default'} threads, agreement {100 * agreement:.2f}%)")
+        del model
+
+
+def evaluation_pairs(sets):
+    """(claim, text) pairs: each recorded set with its own claim, then every claim of claims_file with a sample of the pool."""
+    pairs = [(claim, tweet["text"]) for claim, tweets in sets for tweet in tweets]
+    pool = [tweet["text"] for _, tweets in sets for tweet in tweets]
+    with open(claims_file, encoding="utf-8") as file:
+        claims = [line.strip() for line in file if line.strip()]
+    rng = random.Random(0)
+    for claim in claims:
+        pairs.extend((claim, text) for text in rng.sample(pool, min(len(pool), tweets_per_claim)))
+    return pairs
+
+
+def compare_labels(labels, reference_labels):
+    """Agreement with the reference labels, and precision/recall of ENTAILMENT (label 0) against them."""
+    labels, reference_labels = np.asarray(labels), np.asarray(reference_labels)
+    predicted, actual = labels == 0, reference_labels == 0
+    precision = (predicted & actual).sum() / predicted.sum() if predicted.any() else 1.0
+    recall = (predicted & actual).sum() / actual.sum() if actual.any() else 1.0
+    return (labels == reference_labels).mean(), precision, recall
+
+
+def evaluate_models(sets):
+    pairs = evaluation_pairs(sets)
+    claims, texts = [claim for claim, _ in pairs], [text for _, text in pairs]
+    print(f"{len(pairs)} (claim, tweet) pairs, {len(set(claims))} claims\n")
+
+    def timed(model):
+        model.predict_pairs_proba(claims[:8], texts[:8])  # Warm up
+        start_time = time.perf_counter()
+        labels, _, _ = model.predict_pairs_proba(claims, texts)
+        return labels, time.perf_counter() - start_time
+
+    def report(name, labels, elapsed, extra=""):
+        agreement, precision, recall = compare_labels(labels, reference_labels)
+        print(f"[{name:>28}] {len(pairs) / elapsed:8.1f} pairs/s  agreement {100 * agreement:6.2f}%"
+              f"  entailment precision {100 * precision:6.2f}% recall {100 * recall:6.2f}%{extra}")
+
+    reference_model = AlignmentModel(model_name="mdeberta-base")
+    reference_labels, reference_time = timed(reference_model)
+    report("mdeberta-base", reference_labels, reference_time)
+
+    screens = {}
+    for name in eval_models + [screen for screen, _ in eval_cascades if screen not in eval_models]:
+        try:
+            screens[name] = AlignmentModel(model_name=name)
+        except Exception as e:
+            print(f"[{name:>28}] unavailable: {e}")
+            continue
+        if name in eval_models:
+            labels, elapsed = timed(screens[name])
+            report(name, labels, elapsed, f"  ({reference_time / elapsed:.1f}x faster)")
+
+    for screen, confidence in eval_cascades:
+        if screen not in screens:
+            continue
+        cascade = CascadeAlignmentModel(screens[screen], reference_model, confidence=confidence)
+        labels, elapsed = timed(cascade)
+        escalated = cascade.n_escalated / cascade.n_pairs
+        report(f"{screen} -> mdeberta @ {confidence}", labels, elapsed,
+               f"  ({reference_time / elapsed:.1f}x faster, {100 * escalated:.1f}% escalated)")
+
+
+def main():
+    sets = load_recorded_sets()
+    if not sets:
+        print(f"No recorded tweet sets found in {results_dir}.")
+        return 1
+    n_tweets = sum(len(tweets) for _, tweets in sets)
+    print(f"\n{len(sets)} claims, {n_tweets} tweets\n")
+
+    if "--runtime" in sys.argv[1:]:
+        benchmark_runtime(sets)
+        return 0
+    if "--models" in sys.argv[1:]:
+        evaluate_models(sets)
+        return 0
+
+    results = {}
+    for backend in [reference] + [b for b in backends if b != reference]:
+        try:
+            model = AlignmentModel(backend=backend)
+        except ImportError as e:
+            print(f"Skipping backend '{backend}': {e}")
+            continue
+        results[backend] = run_backend(model, sets)
+        del model
+
+    if reference not in results:
+        print(f"Reference backend '{reference}' is not available.")
+        return 1
+
+    reference_labels = [label for labels in results[reference][0] for label in labels]
+    for backend, (labels, elapsed) in results.items():
+        flat = [label for set_labels in labels for label in set_labels]
+        agreement = sum(a == b for a, b in zip(flat, reference_labels)) / len(flat)
+        print(f"[{backend:>9}] {n_tweets / elapsed:8.1f} tweets/s  ({1000 * elapsed / n_tweets:.2f} ms/tweet)"
+              f"  agreement with {reference}: {100 * agreement:.2f}%")
+
+    if prefilter_thresholds:
+        report_prefilter(sets, reference_labels)
+    if matrix_benchmark:
+        report_matrix(sets)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
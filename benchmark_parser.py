@@ -0,0 +1,86 @@
+"""
+Equivalence check and throughput benchmark for the Nitter HTML parser backends.
+
+Runs every backend in nitter_parser over a directory of saved Nitter search pages,
+checks that each one returns exactly the same tweets and cursor/"finished"/"exceeded_length"
+signal as the reference html.parser backend, and reports pages per second.
+
+By default it uses the small pages in data/parser_fixtures (a search page with replies,
+quotes, entities and a cursor, a last page, an end of timeline, an empty search and a
+too-long query). Their expected output is stored in expected.json next to them, so the
+reference backend is checked as well. Pass another directory, e.g. one collected with
+ScraperNitter(html_dump_dir="data/html_pages"), to compare on real crawls; with --check
+only the equivalence is checked, without timing.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+from nitter_parser import PARSERS
+
+
+##################################################
+################# PARAMETERS #####################
+##################################################
+
+args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+html_dir = args[0] if args else "data/parser_fixtures"  # Directory with saved *.html pages
+check_only = "--check" in sys.argv[1:]                  # Only check the output, skip the timing
+repeats = 5                                             # Passes over the pages per backend
+reference = "html.parser"                               # Backend the others must match
+
+
+##################################################
+##################### MAIN #######################
+##################################################
+
+def main():
+    pages = {path.name: path.read_text(encoding="utf-8") for path in sorted(Path(html_dir).glob("*.html"))}
+    if not pages:
+        print(f"No saved pages found in {html_dir}.")
+        return 1
+
+    backends = {}
+    for name, backend_cls in PARSERS.items():
+        try:
+            backends[name] = backend_cls()
+        except ImportError as e:
+            print(f"Skipping backend '{name}': {e}")
+
+    expected = {name: backends[reference].parse(html) for name, html in pages.items()}
+    n_tweets = sum(len(tweets or []) for tweets, _ in expected.values())
+    print(f"\n{len(pages)} pages, {n_tweets} tweets in {html_dir}\n")
+
+    failed = False
+    expected_path = Path(html_dir) / "expected.json"
+    if expected_path.exists():
+        recorded = {name: tuple(result) for name, result in json.loads(expected_path.read_text(encoding="utf-8")).items()}
+        wrong = [name for name in pages if recorded.get(name) != expected[name]]
+        if wrong:
+            failed = True
+            print(f"[{reference}] {len(wrong)} pages differ from {expected_path.name}, e.g. {wrong[:3]}")
+    for backend_name, backend in backends.items():
+        mismatches = [name for name, html in pages.items() if backend.parse(html) != expected[name]]
+        if mismatches:
+            failed = True
+            print(f"[{backend_name}] {len(mismatches)} pages differ from {reference}, e.g. {mismatches[:3]}")
+        if check_only:
+            print(f"[{backend_name}] {'identical output' if not mismatches else 'MISMATCH'}")
+            continue
+
+        start_time = time.perf_counter()
+        for _ in range(repeats):
+            for html in pages.values():
+                backend.parse(html)
+        elapsed = time.perf_counter() - start_time
+        n_parsed = repeats * len(pages)
+        print(f"[{backend_name}] {n_parsed / elapsed:8.1f} pages/s  ({1000 * elapsed / n_parsed:.2f} ms/page)"
+              f"  {'identical output' if not mismatches else 'MISMATCH'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Resumable checkpoints for long Nitter crawls.
+
+A checkpoint belongs to one search window, identified by its search URL (query, filters,
+since and until). It consists of two files in the checkpoint directory:
+
+- <key>.jsonl: the tweets collected so far, one JSON object per line, append-only.
+- <key>.json: the query, window, cursor of the next page to fetch and how many lines of
+  the .jsonl file belong to that cursor. It is replaced atomically on every save.
+
+Tweets are appended before the metadata is replaced, so after a crash the metadata always
+points at a cursor whose tweets are fully on disk; any extra lines are ignored on load.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+
+class CrawlCheckpoint:
+    def __init__(self, directory="data/checkpoints", every_n_pages=5):
+        self.directory = directory
+        self.every_n_pages = every_n_pages  # Pages between two saves of the same window
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:24]
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".jsonl"
+
+    def load(self, url):
+        """Return the saved state of a window ({"cursor", "tweets", ...}) or None if there is none."""
+        meta_path, tweets_path = self._paths(url)
+        if not os.path.exists(meta_path):
+            if os.path.exists(tweets_path):  # Interrupted before the first save completed
+                os.remove(tweets_path)
+            return None
+
+        with open(meta_path, encoding="utf-8") as file:
+            state = json.load(file)
+        if state.get("url") != url:
+            return None
+
+        tweets = []
+        extra_lines = False
+        if os.path.exists(tweets_path):
+            with open(tweets_path, encoding="utf-8") as file:
+                for line in file:
+                    if len(tweets) >= state["n_tweets"]:
+                        extra_lines = True
+                        break
+                    tweets.append(json.loads(line))
+
+        if extra_lines:  # Interrupted between appending tweets and saving the metadata
+            with open(tweets_path, "w", encoding="utf-8") as file:
+                file.writelines(json.dumps(tweet) + "\n" for tweet in tweets)
+
+        state["tweets"] = tweets
+        return state
+
+    def save(self, url, query, since, until, cursor, new_tweets, n_tweets):
+        """
+        Append the tweets collected since the last save and record `cursor` as the next page
+        to fetch. `n_tweets` is the total number of tweets of the window including new_tweets.
+        """
+        meta_path, tweets_path = self._paths(url)
+        with open(tweets_path, "a", encoding="utf-8") as file:
+            for tweet in new_tweets:
+                file.write(json.dumps(tweet) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+        state = {
+            "url": url,
+            "query": query,
+            "since": since,
+            "until": until,
+            "cursor": cursor,
+            "n_tweets": n_tweets,
+            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(state, file)
+        os.replace(tmp_path, meta_path)
+
+    def delete(self, url):
+        """Remove a window's checkpoint once it has been crawled completely."""
+        for path in self._paths(url):
+            if os.path.exists(path):
+                os.remove(path)
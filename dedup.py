@@ -0,0 +1,169 @@
+"""
+Near-duplicate detection for scraped tweets.
+
+Copy-paste spam and templated tweets differ only in URLs, quoting, casing or a few words.
+Texts are normalized first (HTML entities, quotes, "\\n" escapes, URLs, punctuation,
+whitespace, case); identical normalized texts are grouped directly, and the remaining ones
+are compared with MinHash signatures over word 3-shingles, bucketed with locality-sensitive
+hashing (LSH) so only likely pairs are compared. A candidate pair joins the same group when the Jaccard
+similarity of its shingle sets reaches the threshold.
+
+group_near_duplicates groups one list of texts at once. DuplicateIndex does the same
+incrementally, for texts that arrive page by page during a crawl: each new text is matched
+against the representatives of the groups seen so far.
+"""
+
+import html
+import re
+import zlib
+
+import numpy as np
+
+_URL_RE = re.compile(r"(https?://\S+|www\.\S+|\b[\w-]+(\.[\w-]+)+/\S*)")
+_QUOTES = str.maketrans({"“": '"', "”": '"', "„": '"', "‘": "'", "’": "'", "`": "'"})
+_PUNCTUATION_RE = re.compile(r"[^\w\s']")
+_PRIME = (1 << 31) - 1  # Mersenne prime for the MinHash permutations; products stay within int64
+
+
+def normalize_text(text):
+    """Canonical form of a tweet's text for duplicate detection."""
+    text = html.unescape(text or "").strip()
+    if len(text) >= 2 and text[0] == text[-1] == '"':  # Quotes added by the parser for the CSV
+        text = text[1:-1]
+    text = text.replace("\\n", " ").translate(_QUOTES)
+    text = _PUNCTUATION_RE.sub(" ", _URL_RE.sub(" ", text))
+    return " ".join(text.lower().split())
+
+
+def _shingles(text, size=3):
+    words = text.split()
+    if len(words) <= size:
+        return {text}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i != root_j:
+            self.parent[max(root_i, root_j)] = min(root_i, root_j)
+
+
+def _permutations(num_perm, seed):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _PRIME, size=num_perm, dtype=np.int64)
+    b = rng.integers(0, _PRIME, size=num_perm, dtype=np.int64)
+    return a, b
+
+
+def _band_keys(shingles, a, b, bands):
+    """LSH bucket keys of a shingle set: one per band of its MinHash signature."""
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) % _PRIME for s in shingles), dtype=np.int64)
+    signature = ((np.outer(a, hashes) + b[:, None]) % _PRIME).min(axis=1)
+    rows = len(a) // bands
+    return [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(bands)]
+
+
+def group_near_duplicates(texts, threshold=0.9, num_perm=64, bands=16, seed=1):
+    """
+    Group the indices of near-duplicate texts. Returns a list of groups (lists of indices in
+    increasing order), singletons included, ordered by their first index, so the first member
+    of each group is the earliest one in the input order.
+    """
+    normalized = [normalize_text(text) for text in texts]
+    uf = _UnionFind(len(texts))
+
+    # Exact duplicates after normalization
+    first_seen = {}
+    for i, text in enumerate(normalized):
+        if text in first_seen:
+            uf.union(first_seen[text], i)
+        else:
+            first_seen[text] = i
+
+    # MinHash + LSH over the distinct normalized texts
+    distinct = list(first_seen.values())
+    if len(distinct) > 1 and threshold < 1:
+        shingles = {i: _shingles(normalized[i]) for i in distinct}
+        a, b = _permutations(num_perm, seed)
+
+        buckets = {}
+        for i in distinct:
+            for key in _band_keys(shingles[i], a, b, bands):
+                buckets.setdefault(key, []).append(i)
+
+        compared = set()
+        for members in buckets.values():
+            for x, i in enumerate(members):
+                for j in members[x + 1:]:
+                    if (i, j) in compared or uf.find(i) == uf.find(j):
+                        continue
+                    compared.add((i, j))
+                    if _jaccard(shingles[i], shingles[j]) >= threshold:
+                        uf.union(i, j)
+
+    groups = {}
+    for i in range(len(texts)):
+        groups.setdefault(uf.find(i), []).append(i)
+    return sorted(groups.values(), key=lambda group: group[0])
+
+
+class DuplicateIndex:
+    def __init__(self, threshold=0.9, num_perm=64, bands=16, seed=1):
+        self.threshold = threshold  # Jaccard similarity of the shingle sets at which a text joins a group
+        self.bands = bands
+        self.a, self.b = _permutations(num_perm, seed)
+        self.exact = {}  # Normalized text -> group id
+        self.shingles = {}  # Group id -> shingle set of its representative
+        self.buckets = {}  # LSH bucket key -> group ids
+        self.groups = []  # Group id -> items, the representative (first added) first
+        self.item_groups = {}  # id(item) -> group id, so adding an item again does not count it twice
+
+    def add(self, texts, items=None):
+        """
+        Add texts (with the items they belong to, the texts themselves by default) and return the
+        group id of each. A text joins the group of the first representative it nearly duplicates,
+        otherwise it starts a new group. The members of every group are in self.groups.
+        """
+        items = texts if items is None else items
+        group_ids = []
+        for text, item in zip(texts, items):
+            if id(item) in self.item_groups:
+                group_ids.append(self.item_groups[id(item)])
+                continue
+
+            normalized = normalize_text(text)
+            group = self.exact.get(normalized)
+            if group is None and self.threshold < 1:
+                shingles = _shingles(normalized)
+                keys = _band_keys(shingles, self.a, self.b, self.bands)
+                candidates = dict.fromkeys(g for key in keys for g in self.buckets.get(key, ()))
+                group = next((g for g in candidates if _jaccard(shingles, self.shingles[g]) >= self.threshold), None)
+                if group is None:  # New representative
+                    group = len(self.groups)
+                    self.groups.append([])
+                    self.shingles[group] = shingles
+                    for key in keys:
+                        self.buckets.setdefault(key, []).append(group)
+            elif group is None:
+                group = len(self.groups)
+                self.groups.append([])
+            self.exact.setdefault(normalized, group)
+
+            self.groups[group].append(item)
+            self.item_groups[id(item)] = group
+            group_ids.append(group)
+        return group_ids
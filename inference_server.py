@@ -0,0 +1,134 @@
+"""
+In-process inference service that batches alignment requests across callers.
+
+Concurrent /api/analyze calls (or benchmark claims run side by side) each produce small
+windows of tweets. Instead of every caller running its own small batches, they submit
+(claim, tweet) pairs to one InferenceServer that owns a single AlignmentModel. A worker
+task takes pairs from an asyncio queue and dispatches them to the model in one batch as
+soon as max_batch_pairs are waiting or the oldest pair has waited max_latency seconds.
+While a batch runs in the executor, new pairs keep queuing, so the next batch grows with
+the load. Each caller awaits futures that resolve to its own (label, probs) results.
+"""
+
+import asyncio
+import time
+
+from model_registry import get_alignment_model
+
+
+class InferenceServer:
+    def __init__(self, model=None, max_batch_pairs=256, max_latency=0.02, executor=None):
+        self.model = model  # AlignmentModel; the shared one from model_registry when None
+        self.max_batch_pairs = max_batch_pairs  # Pairs dispatched to the model at most in one batch
+        self.max_latency = max_latency  # Seconds the first pair of a batch waits for others to join
+        self.executor = executor  # Where batches run, None for asyncio's default pool
+        self.queue = None
+        self.worker = None
+        self.start_lock = asyncio.Lock()  # Concurrent first callers wait for one start
+        self.in_flight = []  # Pairs of the batch the model is working on
+        self.n_batches = 0
+        self.n_pairs = 0
+        self.busy_time = 0.0
+
+    async def start(self):
+        async with self.start_lock:
+            if self.worker is not None:
+                return
+            loop = asyncio.get_running_loop()
+            if self.model is None:
+                self.model = await loop.run_in_executor(self.executor, get_alignment_model)
+            self.queue = asyncio.Queue()
+            self.worker = asyncio.create_task(self._serve())
+
+    async def stop(self):
+        if self.worker is None:
+            return
+        self.worker.cancel()
+        try:
+            await self.worker
+        except asyncio.CancelledError:
+            pass
+        self.worker = None
+        pending = list(self.in_flight)  # Fail the batch that was running and the pairs never dispatched
+        self.in_flight = []
+        while not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+        for _, _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Inference server stopped."))
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def predict_pairs(self, claims, texts):
+        """Classify (claims[i], texts[i]) pairs. Returns a list of (label, probs) in input order."""
+        if self.worker is None:
+            await self.start()
+        loop = asyncio.get_running_loop()
+        futures = []
+        for claim, text in zip(claims, texts):
+            future = loop.create_future()
+            self.queue.put_nowait((claim, text, future))
+            futures.append(future)
+        return await asyncio.gather(*futures)
+
+    async def batch_predict_proba(self, original_claim, tweets):
+        """Async counterpart of AlignmentModel.batch_predict_proba. Returns (labels, probs)."""
+        results = await self.predict_pairs([original_claim] * len(tweets), [t["text"] for t in tweets])
+        return [label for label, _ in results], [probs for _, probs in results]
+
+    async def _next_batch(self):
+        """Wait for a first pair, then gather more until the batch is full or max_latency has passed."""
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.max_batch_pairs:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return [item for item in batch if not item[2].done()]  # Skip pairs of cancelled callers
+
+    async def _serve(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            if not batch:
+                continue
+            self.in_flight = batch
+            claims = [claim for claim, _, _ in batch]
+            texts = [text for _, text, _ in batch]
+            start_time = time.perf_counter()
+            try:
+                labels, probs, _ = await loop.run_in_executor(self.executor, self.model.predict_pairs_proba, claims, texts)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                self.in_flight = []
+                continue
+            self.in_flight = []
+            self.busy_time += time.perf_counter() - start_time
+            self.n_batches += 1
+            self.n_pairs += len(batch)
+            for (_, _, future), label, label_probs in zip(batch, labels, probs):
+                if not future.done():
+                    future.set_result((label, label_probs))
+
+    def stats(self):
+        return {
+            "batches": self.n_batches,
+            "pairs": self.n_pairs,
+            "mean_batch_pairs": round(self.n_pairs / self.n_batches, 1) if self.n_batches else 0.0,
+            "pairs_per_second": round(self.n_pairs / self.busy_time, 1) if self.busy_time else 0.0,
+            "queued": self.queue.qsize() if self.queue is not None else 0,
+        }
@@ -0,0 +1,134 @@
+"""
+Health-scored routing of requests over the available Nitter instances.
+
+For each instance the router keeps an exponentially weighted moving average (EWMA) of
+its latency, error rate, empty-page rate and rate-limit (HTTP 429) rate, and sends each
+request to the healthiest one. An instance that keeps failing gets its circuit breaker
+opened: it receives no traffic for a cooling-off period (doubling on every reopen),
+after which it is tried again.
+"""
+
+import time
+
+
+class InstanceHealth:
+    def __init__(self, domain, initial_latency=5.0):
+        self.domain = domain
+        self.latency = initial_latency  # EWMA of seconds per page
+        self.error_rate = 0.0  # EWMA of failed requests (network errors, 5xx, bot walls)
+        self.empty_rate = 0.0  # EWMA of 200 responses without tweets that are not the end of the timeline
+        self.rate_limit_rate = 0.0  # EWMA of HTTP 429 responses
+        self.requests = 0
+        self.errors = 0
+        self.empty_pages = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self.open_until = 0.0  # Circuit breaker is open (no traffic) until this timestamp
+
+    def is_open(self, now=None):
+        return (now or time.monotonic()) < self.open_until
+
+    def score(self):
+        """Expected cost of sending a request here: lower is healthier."""
+        penalty = 1 + 4 * self.error_rate + 2 * self.empty_rate + 6 * self.rate_limit_rate
+        return self.latency * penalty * (1 + self.in_flight)
+
+    def as_dict(self, now=None):
+        now = now or time.monotonic()
+        return {
+            "latency_ewma": round(self.latency, 3),
+            "error_rate": round(self.error_rate, 3),
+            "empty_rate": round(self.empty_rate, 3),
+            "rate_limit_rate": round(self.rate_limit_rate, 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "empty_pages": self.empty_pages,
+            "rate_limited": self.rate_limited,
+            "in_flight": self.in_flight,
+            "consecutive_failures": self.consecutive_failures,
+            "circuit_open": self.is_open(now),
+            "reopens_in": round(max(0.0, self.open_until - now), 1),
+            "score": round(self.score(), 3),
+        }
+
+
+class InstanceRouter:
+    def __init__(self, domains, alpha=0.3, failure_threshold=3, cooldown=60.0, max_cooldown=900.0, stickiness=1.5):
+        self.alpha = alpha  # Weight of the newest observation in the EWMAs
+        self.failure_threshold = failure_threshold  # Consecutive failures that open the circuit breaker
+        self.cooldown = cooldown  # Seconds an instance is skipped the first time its breaker opens
+        self.max_cooldown = max_cooldown  # Upper bound for the doubling cooldown
+        self.stickiness = stickiness  # Keep the preferred instance unless the best one scores this much better
+        self.health = {domain: InstanceHealth(domain) for domain in domains}
+
+    def _ewma(self, old, new):
+        return (1 - self.alpha) * old + self.alpha * new
+
+    def choose(self, prefer=None, exclude=()):
+        """
+        Return the healthiest instance whose circuit breaker is closed. `prefer` (e.g. the
+        instance a crawl is already on) is kept while it is not much worse than the best.
+        If every breaker is open, the instance that reopens first is returned.
+        """
+        now = time.monotonic()
+        candidates = [h for d, h in self.health.items() if d not in exclude and not h.is_open(now)]
+        if not candidates:
+            candidates = [h for d, h in self.health.items() if d not in exclude] or list(self.health.values())
+            return min(candidates, key=lambda h: h.open_until).domain
+
+        best = min(candidates, key=lambda h: h.score())
+        preferred = self.health.get(prefer)
+        if preferred in candidates and preferred.score() <= best.score() * self.stickiness:
+            return preferred.domain
+        return best.domain
+
+    def start(self, domain):
+        """Mark a request to `domain` as in flight."""
+        self.health.setdefault(domain, InstanceHealth(domain)).in_flight += 1
+
+    def finish(self, domain):
+        """Release the in-flight slot of a request that ended without an outcome (e.g. cancelled)."""
+        health = self.health.setdefault(domain, InstanceHealth(domain))
+        health.in_flight = max(0, health.in_flight - 1)
+
+    def record(self, domain, latency, status_code, n_tweets=0, finished=False):
+        """Update the instance's health with the outcome of one request."""
+        health = self.health.setdefault(domain, InstanceHealth(domain))
+        health.in_flight = max(0, health.in_flight - 1)
+        health.requests += 1
+
+        rate_limited = status_code == 429
+        failed = status_code != 200
+        empty = not failed and n_tweets == 0 and not finished
+
+        health.latency = self._ewma(health.latency, latency)
+        health.error_rate = self._ewma(health.error_rate, float(failed and not rate_limited))
+        health.rate_limit_rate = self._ewma(health.rate_limit_rate, float(rate_limited))
+        health.empty_rate = self._ewma(health.empty_rate, float(empty))
+        health.errors += failed and not rate_limited
+        health.rate_limited += rate_limited
+        health.empty_pages += empty
+
+        if failed or empty:
+            health.consecutive_failures += 1
+            if health.consecutive_failures >= self.failure_threshold or rate_limited:
+                self._open(health)
+        else:
+            health.consecutive_failures = 0
+            health.times_opened = 0
+
+    def _open(self, health):
+        """Open the instance's circuit breaker for a cooling-off period."""
+        cooldown = min(self.max_cooldown, self.cooldown * 2 ** health.times_opened)
+        health.open_until = time.monotonic() + cooldown
+        health.times_opened += 1
+        health.consecutive_failures = 0
+        print(f"Circuit breaker opened for {health.domain} ({cooldown:.0f} s).")
+
+    def state(self):
+        """Snapshot of every instance's health, healthiest first."""
+        now = time.monotonic()
+        ordered = sorted(self.health.values(), key=lambda h: (h.is_open(now), h.score()))
+        return {h.domain: h.as_dict(now) for h in ordered}
@@ -0,0 +1,54 @@
+"""
+Cached, batch-capable keyword extraction.
+
+QueryGenerator and SynonymQueryBuilder extract the keywords of one claim at a time. The
+KeywordService keeps the shared KeyBERT model from model_registry, takes lists of claims
+and sends the ones it has not seen to KeyBERT together, so their documents and candidate
+words are embedded in a few batched forward passes. Results are memoized by the
+normalized claim text and top_n, so a claim whose keywords were extracted up front (e.g.
+all of list_of_claims.txt in benchmark.py) costs nothing when its query is built.
+"""
+
+from model_registry import DEFAULT_KEYBERT_MODEL, get_keybert, keybert_lock
+from prediction_cache import normalize_text
+
+
+class KeywordService:
+    def __init__(self, model_name=DEFAULT_KEYBERT_MODEL, batch_size=64, max_entries=100_000):
+        self.model_name = model_name  # Sentence-transformer behind KeyBERT
+        self.batch_size = batch_size  # Claims sent to KeyBERT in one call
+        self.max_entries = max_entries  # Bound on the memoized results, oldest dropped first
+        self.memo = {}  # (normalized claim, top_n) -> list of keywords
+        self.hits = 0
+        self.misses = 0
+
+    def extract_keywords(self, claims, top_n=5):
+        """
+        Keywords of every claim, most relevant first. Accepts a single claim (returns its list of
+        keywords) or a list of claims (returns one list per claim, in input order).
+        """
+        if isinstance(claims, str):
+            return self.extract_keywords([claims], top_n)[0]
+
+        keys = [(normalize_text(claim), top_n) for claim in claims]
+        with keybert_lock:  # Also guards the memo
+            missing = list(dict.fromkeys(key for key in keys if key not in self.memo))
+            n_hits = sum(key in self.memo for key in keys)  # Repeats of a claim that is not memoized yet are misses
+            self.hits += n_hits
+            self.misses += len(keys) - n_hits
+            if missing:
+                kw_model = get_keybert(self.model_name)
+                for start in range(0, len(missing), self.batch_size):
+                    batch = missing[start:start + self.batch_size]
+                    results = kw_model.extract_keywords([claim for claim, _ in batch], top_n=top_n)
+                    if len(batch) == 1:  # KeyBERT unwraps the result of a single document
+                        results = [results]
+                    for key, keywords in zip(batch, results):
+                        self.memo[key] = [k[0] for k in keywords]
+            keywords = [list(self.memo[key]) for key in keys]
+            while len(self.memo) > self.max_entries:
+                del self.memo[next(iter(self.memo))]
+        return keywords
+
+    def stats(self):
+        return {"memoized": len(self.memo), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,137 @@
+"""
+Process-wide registry of the heavy models used by the pipeline.
+
+The NLI alignment model, the KeyBERT sentence-transformer and the spaCy pipeline used
+for synonyms take seconds to load, far more than it takes to process a short claim.
+The registry loads each of them once per process, keyed by model name (and device for
+the transformer models), and hands the same instance to every caller. Loading is
+guarded by a lock per key, so concurrent requests wait for the first load instead of
+starting their own.
+"""
+
+import os
+import threading
+import time
+
+DEFAULT_ALIGNMENT_MODEL = "MoritzLaurer/mDeBERTa-v3-base-mnli-xnli"
+DEFAULT_KEYBERT_MODEL = "AIDA-UPM/mstsb-paraphrase-multilingual-mpnet-base-v2"
+DEFAULT_SPACY_MODEL = "en_core_web_md"
+
+_models = {}
+_key_locks = {}
+_registry_lock = threading.Lock()
+_load_times = {}  # Seconds spent loading each key
+
+
+def _default_device():
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _get_or_load(key, loader):
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _registry_lock:
+        lock = _key_locks.setdefault(key, threading.Lock())
+    with lock:
+        if key not in _models:  # Another thread may have loaded it while we waited
+            start = time.perf_counter()
+            _models[key] = loader()
+            _load_times[key] = time.perf_counter() - start
+            print(f"Loaded {key[0]} model '{key[1]}'" + (f" on {'/'.join(key[2:])}" if len(key) > 2 else "")
+                  + f" in {_load_times[key]:.1f} s.")
+    return _models[key]
+
+
+def _cpu_threads_setting():
+    value = os.environ.get("ALIGNMENT_CPU_THREADS", "")
+    if value == "auto":
+        return value
+    return int(value) if value else None
+
+
+def get_alignment_model(model_name=DEFAULT_ALIGNMENT_MODEL, device=None, backend=None):
+    """
+    Shared AlignmentModel for `model_name` on `device` (CUDA if available by default). `backend`
+    ("torch", "onnx" or "onnx-int8") defaults to the ALIGNMENT_BACKEND environment variable, else "torch".
+    Predictions go through the shared on-disk PredictionCache unless PREDICTION_CACHE=0.
+    ALIGNMENT_COMPILE=1 enables torch.compile and ALIGNMENT_BF16=1 (or "auto") bfloat16 autocast on CPU.
+    ALIGNMENT_CPU_THREADS sets PyTorch's CPU threads to a number, or to "auto" to split the available
+    cores between the INFERENCE_WORKERS threads of the app; unset, PyTorch's defaults are kept.
+    """
+    from alignment import AlignmentModel, NLI_MODELS
+    model_name = NLI_MODELS.get(model_name, model_name)
+    backend = backend or os.environ.get("ALIGNMENT_BACKEND", "torch")
+    device = "cpu" if backend != "torch" else (device or _default_device())
+    cache = get_prediction_cache() if os.environ.get("PREDICTION_CACHE", "1") != "0" else None
+    return _get_or_load(("alignment", model_name, device, backend),
+                        lambda: AlignmentModel(model_name=model_name, device=device, backend=backend, cache=cache,
+                                               cpu_threads=_cpu_threads_setting(),
+                                               cpu_workers=int(os.environ.get("INFERENCE_WORKERS", "2")),
+                                               compile=os.environ.get("ALIGNMENT_COMPILE", "0") == "1",
+                                               bf16={"1": True, "auto": "auto"}.get(os.environ.get("ALIGNMENT_BF16", "0"), False)))
+
+
+def get_cascade_model(screen_model, full_model=DEFAULT_ALIGNMENT_MODEL, confidence=0.9):
+    """Shared two-stage model: `screen_model` labels every tweet, uncertain ones go to `full_model`."""
+    from alignment import CascadeAlignmentModel
+    return _get_or_load(("cascade", f"{screen_model}->{full_model}", str(confidence)),
+                        lambda: CascadeAlignmentModel(get_alignment_model(screen_model), get_alignment_model(full_model),
+                                                      confidence=confidence))
+
+
+def get_prediction_cache(path="cache/predictions.sqlite"):
+    """Shared on-disk cache of alignment predictions."""
+    from prediction_cache import PredictionCache
+    return _get_or_load(("prediction-cache", path), lambda: PredictionCache(path))
+
+
+# Held around every call into a shared KeyBERT model or its sentence-transformer (keyword
+# extraction, prefilter embeddings): their tokenizers are not thread-safe
+keybert_lock = threading.Lock()
+
+
+def get_keybert(model_name=DEFAULT_KEYBERT_MODEL, device=None):
+    """Shared KeyBERT instance backed by the sentence-transformer `model_name`."""
+    from keybert import KeyBERT
+    from sentence_transformers import SentenceTransformer
+    device = device or _default_device()
+    return _get_or_load(("keybert", model_name, device),
+                        lambda: KeyBERT(model=SentenceTransformer(model_name, device=device)))
+
+
+def get_keyword_service(model_name=DEFAULT_KEYBERT_MODEL):
+    """Shared KeywordService, which memoizes and batches keyword extraction with the shared KeyBERT model."""
+    from keyword_service import KeywordService
+    return _get_or_load(("keywords", model_name), lambda: KeywordService(model_name=model_name))
+
+
+def get_synonyms(model_name=DEFAULT_SPACY_MODEL):
+    """Shared Synonyms finder with the spaCy pipeline `model_name` loaded."""
+    from synonyms import Synonyms
+    return _get_or_load(("spacy", model_name), lambda: Synonyms(model_name=model_name))
+
+
+def warmup(alignment=True, keywords=True, synonyms=True):
+    """Load the default models ahead of the first request. Returns the load times."""
+    if alignment:
+        get_alignment_model()
+    if keywords:
+        get_keybert()
+    if synonyms:
+        get_synonyms()
+    return load_times()
+
+
+def load_times():
+    """Seconds spent loading each model so far, e.g. {"alignment:<name>:cpu": 7.9}."""
+    return {":".join(key): round(seconds, 2) for key, seconds in _load_times.items()}
+
+
+def clear():
+    """Drop every loaded model, e.g. to free memory in long-running jobs."""
+    with _registry_lock:
+        _models.clear()
+        _load_times.clear()
@@ -0,0 +1,198 @@
+"""
+Parser backends for Nitter search pages.
+
+Every backend turns the HTML of a search page into the same (tweets, cursor) pair:
+a list of tweet dicts plus the "&cursor=..." of the next page, or (None, "finished")
+at the end of the timeline and (None, "exceeded_length") when the query is too long.
+
+SoupParser is the original BeautifulSoup + html.parser implementation. LxmlParser does
+the same work with lxml and XPath, which is several times faster and releases the GIL
+while parsing, so it can run in a worker thread when many pages arrive concurrently.
+"""
+
+from datetime import datetime
+from bs4 import BeautifulSoup
+
+
+def ts_to_iso8601(ts):
+    dt = datetime.strptime(ts.replace(" ·", ""), "%b %d, %Y %I:%M %p %Z")
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _stat_to_int(text):
+    return int(text.replace(",", "")) if text else 0
+
+
+class SoupParser:
+    name = "html.parser"
+
+    def parse(self, html_content):
+        """Parses the HTML content to extract tweet information."""
+
+        soup = BeautifulSoup(html_content, "html.parser")
+        tweets = []
+
+        # If timeline-end for if tweets where found or timeline-none for if no tweets where found
+        if soup.find("h2", class_="timeline-end") or soup.find("h2", class_="timeline-none"):
+            return None, "finished"
+
+        # If the input is too long, return no tweets and an error message
+        error_div = soup.find("div", class_=lambda c: c and "error-panel" in c)
+        if error_div and "search input too long" in error_div.get_text(strip=True).lower():
+            return None, "exceeded_length"
+
+        for tweet in soup.find_all("div", class_="timeline-item"):
+            tweet_data = {}
+            tweet_body = tweet.find("div", class_="tweet-body")
+            if tweet_body:
+                username = tweet_body.find("a", class_="username")
+                tweet_data["user"] = username.text.strip() if username else ""
+
+                content = tweet_body.find("div", class_="tweet-content")
+                content = content.text.strip().replace("\n", "\\n") if content else ""
+                tweet_data["text"] = f'"{content}"' if content else ""  # Wrap text in quotes to handle commmas in CSV
+
+                timestamp = tweet_body.find("span", class_="tweet-date")
+                tweet_data["created_at_datetime"] = ts_to_iso8601(timestamp.a["title"].strip()) if timestamp and timestamp.a else ""
+
+                link = tweet.find("a", class_="tweet-link")
+                tweet_data["link"] = link["href"] if link and link.has_attr("href") else ""
+
+                replying_to = tweet_body.find("div", class_="replying-to", recursive=False)
+                tweet_data["replying-to"] = [a.get_text(strip=True) for a in replying_to.find_all('a')] if replying_to else []
+
+                quote = tweet_body.find("div", class_="quote")
+                quote_user = quote.find("a", class_="username") if quote else None
+                tweet_data["quoting"] = quote_user.text.strip() if quote_user else ""
+
+                tweet_stat = tweet_body.find_all("span", class_="tweet-stat")
+                if len(tweet_stat) < 4:
+                    tweet_data["comments"] = 0
+                    tweet_data["retweets"] = 0
+                    tweet_data["quotes"] = 0
+                    tweet_data["likes"] = 0
+                else:
+                    tweet_data["comments"] = _stat_to_int(tweet_stat[0].div.text.strip())
+                    tweet_data["retweets"] = _stat_to_int(tweet_stat[1].div.text.strip())
+                    tweet_data["quotes"] = _stat_to_int(tweet_stat[2].div.text.strip())
+                    tweet_data["likes"] = _stat_to_int(tweet_stat[3].div.text.strip())
+
+                tweets.append(tweet_data)
+
+        cursor = None
+        show_more = soup.find_all("div", class_="show-more")[-1] if soup.find_all("div", class_="show-more") else None
+        if show_more and show_more.a and show_more.a.has_attr("href"):
+            href = show_more.a["href"]
+            if "&cursor=" in href:
+                cursor = '&cursor=' + href.split("&cursor=")[-1]
+
+        return tweets, cursor
+
+
+def _cls(name):
+    """XPath predicate matching elements that have `name` among their classes (like bs4's class_)."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _first(element, path):
+    found = element.xpath(path)
+    return found[0] if found else None
+
+
+def _stripped_text(element):
+    """Equivalent of bs4's get_text(strip=True): strip every text node and join them."""
+    return "".join(t.strip() for t in element.itertext())
+
+
+class LxmlParser:
+    name = "lxml"
+
+    def __init__(self):
+        from lxml import html as lxml_html  # Optional dependency, only needed for this backend
+        self.lxml_html = lxml_html
+
+    def parse(self, html_content):
+        """Same output as SoupParser.parse, using lxml and XPath."""
+
+        if not html_content or not html_content.strip():
+            return [], None
+        root = self.lxml_html.fromstring(html_content)
+        tweets = []
+
+        if root.xpath(f"//h2[{_cls('timeline-end')} or {_cls('timeline-none')}]"):
+            return None, "finished"
+
+        error_div = _first(root, "//div[contains(@class, 'error-panel')]")
+        if error_div is not None and "search input too long" in _stripped_text(error_div).lower():
+            return None, "exceeded_length"
+
+        for tweet in root.xpath(f"//div[{_cls('timeline-item')}]"):
+            tweet_data = {}
+            tweet_body = _first(tweet, f".//div[{_cls('tweet-body')}]")
+            if tweet_body is not None:
+                username = _first(tweet_body, f".//a[{_cls('username')}]")
+                tweet_data["user"] = username.text_content().strip() if username is not None else ""
+
+                content = _first(tweet_body, f".//div[{_cls('tweet-content')}]")
+                content = content.text_content().strip().replace("\n", "\\n") if content is not None else ""
+                tweet_data["text"] = f'"{content}"' if content else ""  # Wrap text in quotes to handle commmas in CSV
+
+                timestamp = _first(tweet_body, f".//span[{_cls('tweet-date')}]")
+                date_link = _first(timestamp, ".//a") if timestamp is not None else None
+                tweet_data["created_at_datetime"] = ts_to_iso8601(date_link.attrib["title"].strip()) if date_link is not None else ""
+
+                link = _first(tweet, f".//a[{_cls('tweet-link')}]")
+                tweet_data["link"] = link.get("href") if link is not None and link.get("href") is not None else ""
+
+                replying_to = _first(tweet_body, f"./div[{_cls('replying-to')}]")
+                tweet_data["replying-to"] = [_stripped_text(a) for a in replying_to.iter("a")] if replying_to is not None else []
+
+                quote = _first(tweet_body, f".//div[{_cls('quote')}]")
+                quote_user = _first(quote, f".//a[{_cls('username')}]") if quote is not None else None
+                tweet_data["quoting"] = quote_user.text_content().strip() if quote_user is not None else ""
+
+                tweet_stat = tweet_body.xpath(f".//span[{_cls('tweet-stat')}]")
+                if len(tweet_stat) < 4:
+                    tweet_data["comments"] = 0
+                    tweet_data["retweets"] = 0
+                    tweet_data["quotes"] = 0
+                    tweet_data["likes"] = 0
+                else:
+                    stats = [_first(stat, ".//div").text_content().strip() for stat in tweet_stat[:4]]
+                    tweet_data["comments"] = _stat_to_int(stats[0])
+                    tweet_data["retweets"] = _stat_to_int(stats[1])
+                    tweet_data["quotes"] = _stat_to_int(stats[2])
+                    tweet_data["likes"] = _stat_to_int(stats[3])
+
+                tweets.append(tweet_data)
+
+        cursor = None
+        show_more = root.xpath(f"//div[{_cls('show-more')}]")
+        more_link = _first(show_more[-1], ".//a") if show_more else None
+        if more_link is not None and more_link.get("href") is not None:
+            href = more_link.get("href")
+            if "&cursor=" in href:
+                cursor = '&cursor=' + href.split("&cursor=")[-1]
+
+        return tweets, cursor
+
+
+PARSERS = {
+    "html.parser": SoupParser,
+    "lxml": LxmlParser,
+}
+
+
+def get_parser(name="auto"):
+    """
+    Return a parser backend by name ("html.parser" or "lxml"). "auto" picks lxml
+    when it is installed and falls back to BeautifulSoup's html.parser otherwise.
+    """
+    if name == "auto":
+        try:
+            return LxmlParser()
+        except ImportError:
+            return SoupParser()
+    if name not in PARSERS:
+        raise ValueError(f"Unknown parser backend '{name}'. Choose from {list(PARSERS)} or 'auto'.")
+    return PARSERS[name]()
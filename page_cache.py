@@ -0,0 +1,126 @@
+"""
+Persistent on-disk cache of parsed Nitter search pages.
+
+Each entry stores the tweets and the next cursor parsed from one search page, keyed
+by the normalized search URL (as built by ScraperNitter._get_search_url) plus the
+cursor. Windows that lie entirely in the past never change on Twitter, so they get a
+much longer TTL than windows that can still receive new tweets. The cache is bounded
+in size: every `evict_every` writes it counts the stored pages and, once there are more
+than max_entries, deletes the least recently used ones in one chunk.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+
+class PageCache:
+    def __init__(self, path="cache/nitter_pages.sqlite", ttl=6 * 3600, historical_ttl=365 * 24 * 3600,
+                 max_entries=50000, grace_days=2, evict_every=100, evict_chunk=0.05):
+        self.path = path
+        self.ttl = ttl  # Seconds a page of a window that is still open stays valid
+        self.historical_ttl = historical_ttl  # Seconds a page of a window entirely in the past stays valid
+        self.max_entries = max_entries  # LRU bound on the number of stored pages
+        self.grace_days = grace_days  # A window counts as historical once `until` is this many days old
+        self.evict_every = evict_every  # put calls between two checks of the bound
+        self.evict_chunk = evict_chunk  # Extra fraction of max_entries dropped per eviction, so it runs rarely
+        self.puts = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                tweets TEXT,
+                cursor TEXT,
+                expires_at REAL,
+                last_access REAL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_last_access ON pages(last_access)")
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize_url(url):
+        """Order the query parameters and drop empty ones so equivalent search URLs share a key."""
+        parts = urlsplit(url)
+        params = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if v != "")
+        return f"{parts.path}?{urlencode(params)}"
+
+    def _key(self, url, cursor):
+        normalized = self.normalize_url(url) + "|" + (cursor or "")
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def _ttl_for(self, url):
+        """Longer TTL when the search window ends before today (minus a grace period)."""
+        until = dict(parse_qsl(urlsplit(url).query)).get("until", "")
+        try:
+            until_date = datetime.strptime(until, "%Y-%m-%d").date()
+        except ValueError:
+            return self.ttl
+        if until_date <= date.today() - timedelta(days=self.grace_days):
+            return self.historical_ttl
+        return self.ttl
+
+    def get(self, url, cursor=""):
+        """Return (tweets, next_cursor) for a cached page, or None on a miss or expired entry."""
+        key = self._key(url, cursor)
+        row = self.conn.execute("SELECT tweets, cursor, expires_at FROM pages WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or row[2] < now:
+            if row is not None:
+                self.conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self.conn.commit()
+            self.misses += 1
+            return None
+
+        self.conn.execute("UPDATE pages SET last_access = ? WHERE key = ?", (now, key))
+        self.conn.commit()
+        self.hits += 1
+        return json.loads(row[0]), row[1]
+
+    def put(self, url, cursor, tweets, next_cursor):
+        """Store the parsed page, evicting the least recently used pages now and then."""
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pages (key, url, tweets, cursor, expires_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+            (self._key(url, cursor), self.normalize_url(url), json.dumps(tweets), next_cursor,
+             now + self._ttl_for(url), now),
+        )
+        self.puts += 1
+        if self.puts % self.evict_every == 0:
+            self._evict()
+        self.conn.commit()
+
+    def _evict(self):
+        """Delete the oldest pages down to max_entries minus a chunk."""
+        count = self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        n_old = count - self.max_entries + int(self.max_entries * self.evict_chunk)
+        self.conn.execute(
+            """
+            DELETE FROM pages WHERE key IN (
+                SELECT key FROM pages ORDER BY last_access ASC LIMIT ?
+            )
+            """,
+            (n_old,),
+        )
+
+    def clear(self):
+        """Remove every stored page."""
+        self.conn.execute("DELETE FROM pages")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,119 @@
+"""
+Persistent on-disk cache of alignment predictions.
+
+Each entry stores the label and class probabilities the NLI model gave one (claim, tweet)
+pair, keyed by a hash of the model (name and backend), the normalized claim and the
+normalized tweet text. Reruns of find_source/find_all, benchmark runs and small edits
+of a claim's whitespace then only send unseen pairs to the model. The cache is bounded
+in size: every `evict_every` writes it counts the stored entries and, once there are
+more than max_entries, deletes the least recently used ones in one chunk.
+
+The connection is shared between the threads of the inference pool, so every access
+goes through a lock.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+
+def normalize_text(text):
+    """Unicode-normalize and collapse whitespace, so trivially different copies share a key."""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+class PredictionCache:
+    def __init__(self, path="cache/predictions.sqlite", max_entries=1_000_000, evict_every=100, evict_chunk=0.05):
+        self.path = path
+        self.max_entries = max_entries  # LRU bound on the number of stored predictions
+        self.evict_every = evict_every  # put_many calls between two checks of the bound
+        self.evict_chunk = evict_chunk  # Extra fraction of max_entries dropped per eviction, so it runs rarely
+        self.puts = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS predictions (
+                key TEXT PRIMARY KEY,
+                label INTEGER,
+                probs TEXT,
+                last_access REAL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_predictions_last_access ON predictions(last_access)")
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, model, claim, text):
+        normalized = f"{model}\x1f{normalize_text(claim)}\x1f{normalize_text(text)}"
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def get_many(self, model, claim, texts):
+        """Return {index: (label, probs)} for the texts whose prediction is cached."""
+        keys = [self._key(model, claim, text) for text in texts]
+        found = {}
+        with self.lock:
+            for start in range(0, len(keys), 500):  # Stay below SQLite's limit of bound parameters
+                chunk = keys[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT key, label, probs FROM predictions WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update({key: (label, json.loads(probs)) for key, label, probs in rows})
+            if found:
+                now = time.time()
+                self.conn.executemany("UPDATE predictions SET last_access = ? WHERE key = ?",
+                                      [(now, key) for key in found])
+                self.conn.commit()
+
+        hits = {i: found[key] for i, key in enumerate(keys) if key in found}
+        self.hits += len(hits)
+        self.misses += len(keys) - len(hits)
+        return hits
+
+    def put_many(self, model, claim, texts, labels, probs):
+        """Store the predictions of the given texts, evicting the least recently used ones now and then."""
+        now = time.time()
+        rows = [(self._key(model, claim, text), label, json.dumps([round(p, 6) for p in text_probs]), now)
+                for text, label, text_probs in zip(texts, labels, probs)]
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO predictions (key, label, probs, last_access) VALUES (?, ?, ?, ?)", rows
+            )
+            self.puts += 1
+            if self.puts % self.evict_every == 0:
+                self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        """Delete the oldest entries down to max_entries minus a chunk. The caller holds the lock."""
+        count = self.conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        n_old = count - self.max_entries + int(self.max_entries * self.evict_chunk)
+        self.conn.execute(
+            """
+            DELETE FROM predictions WHERE key IN (
+                SELECT key FROM predictions ORDER BY last_access ASC LIMIT ?
+            )
+            """,
+            (n_old,),
+        )
+
+    def clear(self):
+        """Remove every stored prediction."""
+        with self.lock:
+            self.conn.execute("DELETE FROM predictions")
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,79 @@
+"""
+Embedding-similarity prefilter in front of the NLI alignment model.
+
+Most tweets matched by a broad OR-of-ANDs query share a few keywords with the claim but
+are about something else. The prefilter embeds the claim and the tweets with the
+sentence-transformer KeyBERT already loads (one batched pass per call) and only passes
+on tweets whose cosine similarity to the claim reaches `threshold`. The others are
+labeled NEUTRAL without running the cross-encoder. Raising the threshold skips more
+tweets at the cost of recall; benchmark_alignment.py measures both against full NLI.
+"""
+
+import numpy as np
+
+from model_registry import get_keybert, keybert_lock
+
+NEUTRAL = 1  # AlignmentModel label given to skipped tweets
+
+
+class EmbeddingPrefilter:
+    def __init__(self, threshold=0.3, embedder=None):
+        self.threshold = threshold  # Minimum cosine similarity to the claim for a tweet to reach NLI
+        # Sentence-transformer backend of the shared KeyBERT model (has .embed(list_of_texts))
+        self.embedder = embedder or get_keybert().model
+        self.n_seen = 0
+        self.n_skipped = 0
+
+    def _embed(self, texts):
+        with keybert_lock:  # The embedding model is shared with keyword extraction
+            embeddings = np.asarray(self.embedder.embed(texts), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+    def similarities(self, claim, tweets):
+        """Cosine similarity of every tweet to the claim, embedded together in one batch."""
+        if not tweets:
+            return np.zeros(0, dtype=np.float32)
+        embeddings = self._embed([claim] + [t["text"] for t in tweets])
+        return embeddings[1:] @ embeddings[0]
+
+    def split(self, claim, tweets):
+        """
+        Return (candidates, skipped): the tweets that go on to NLI and those that do not.
+        Every tweet gets its "similarity"; skipped ones are also labeled NEUTRAL with
+        "prefiltered" set, so they look classified to the rest of the pipeline.
+        """
+        candidates, skipped = [], []
+        for tweet, similarity in zip(tweets, self.similarities(claim, tweets).tolist()):
+            tweet["similarity"] = round(similarity, 4)
+            if similarity >= self.threshold:
+                candidates.append(tweet)
+            else:
+                tweet["alignment"] = NEUTRAL
+                tweet["probs"] = None
+                tweet["prefiltered"] = True
+                skipped.append(tweet)
+
+        self.n_seen += len(tweets)
+        self.n_skipped += len(skipped)
+        return candidates, skipped
+
+    def stats(self):
+        return {
+            "threshold": self.threshold,
+            "seen": self.n_seen,
+            "skipped": self.n_skipped,
+            "skipped_ratio": round(self.n_skipped / self.n_seen, 3) if self.n_seen else 0.0,
+        }
+
+
+def recall_against_nli(similarities, nli_labels, threshold, entailment=0):
+    """
+    Share of the tweets full NLI labels as ENTAILMENT that the prefilter would keep at
+    `threshold`, together with the share of all tweets it would skip. Returns (recall, skipped_ratio).
+    """
+    similarities = np.asarray(similarities)
+    entailing = np.asarray(nli_labels) == entailment
+    kept = similarities >= threshold
+    recall = float(kept[entailing].mean()) if entailing.any() else 1.0
+    return recall, float(1 - kept.mean()) if len(kept) else 0.0
@@ -1,5 +1,4 @@
-from synonyms import Synonyms
-from keybert import KeyBERT
+from model_registry import DEFAULT_KEYBERT_MODEL, get_keyword_service, get_synonyms
 from itertools import combinations, product
 
 class SynonymQueryBuilder:
@@ -17,15 +16,14 @@ class SynonymQueryBuilder:
 
     def extract_keywords(self, max_keywords=5):
         """Extract keywords from text using KeyBERT."""
-        kw_model = KeyBERT(model="AIDA-UPM/mstsb-paraphrase-multilingual-mpnet-base-v2")
-        keywords = kw_model.extract_keywords(self.sentence, top_n=max_keywords)
-        keywords = [k[0] for k in keywords]
+        kw_service = get_keyword_service(DEFAULT_KEYBERT_MODEL)
+        keywords = kw_service.extract_keywords(self.sentence, top_n=max_keywords)
         print(f"\nExtracted keywords: {keywords}")
         return keywords
     
 
     def get_contextual_synonyms(self, top_n_syns=3, threshold=0.1):
-        synonym_finder = Synonyms(model_name=self.model_name)
+        synonym_finder = get_synonyms(self.model_name)
         for kw in self.keywords:
             self.synonyms[kw] = synonym_finder.find_contextual(
                 word=kw,
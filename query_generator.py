@@ -3,7 +3,7 @@ Module to extract the keywords of a claim, for which we use KeyBERT LLM,
 and build a query suitable for advance search.
 '''
 
-from keybert import KeyBERT
+from model_registry import DEFAULT_KEYBERT_MODEL, get_keyword_service
 from itertools import combinations
 
 
@@ -13,9 +13,8 @@ class QueryGenerator:
 
     def extract_keywords(self, max_keywords):
             """Extract keywords from text using KeyBERT"""
-            kw_model = KeyBERT(model="AIDA-UPM/mstsb-paraphrase-multilingual-mpnet-base-v2")
-            keywords = kw_model.extract_keywords(self.claim, top_n=max_keywords)
-            keywords = [k[0] for k in keywords]
+            kw_service = get_keyword_service(DEFAULT_KEYBERT_MODEL)
+            keywords = kw_service.extract_keywords(self.claim, top_n=max_keywords)
             print(f"\nExtracted keywords: {keywords}")
             return keywords
 
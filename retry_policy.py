@@ -0,0 +1,106 @@
+"""
+Rate limiting and retry policy for the Nitter scraper.
+
+TokenBucket spaces out the requests sent to one instance so crawls do not get throttled.
+RetryBudget bounds the consecutive failed attempts on each page and the wall-clock time
+of one scraper call, sleeping with exponential backoff and jitter between retries. When the budget runs out
+it raises ScrapeError, which carries what was being fetched and why it gave up.
+"""
+
+import asyncio
+import random
+import time
+
+
+class ScrapeError(Exception):
+    """Raised when a scraper call runs out of retries or passes its deadline."""
+
+    def __init__(self, reason, query, url, attempts, elapsed, last_status=None, domains_tried=()):
+        self.reason = reason  # "retries_exhausted" or "deadline_exceeded"
+        self.query = query
+        self.url = url  # Search URL (with cursor) of the page that could not be fetched
+        self.attempts = attempts  # Failed attempts during the call
+        self.elapsed = elapsed  # Seconds since the call started
+        self.last_status = last_status  # Status code of the last failed attempt
+        self.domains_tried = sorted(domains_tried)
+        super().__init__(
+            f"{reason}: gave up on {url} after {attempts} failed attempts in {elapsed:.1f} s "
+            f"(last status {last_status}, instances tried: {', '.join(self.domains_tried) or 'none'})"
+        )
+
+    def as_dict(self):
+        return {
+            "reason": self.reason,
+            "query": self.query,
+            "url": self.url,
+            "attempts": self.attempts,
+            "elapsed": round(self.elapsed, 1),
+            "last_status": self.last_status,
+            "domains_tried": self.domains_tried,
+        }
+
+
+class TokenBucket:
+    def __init__(self, rate=1.0, burst=3):
+        self.rate = rate  # Tokens (requests) added per second
+        self.burst = burst  # Bucket capacity: requests allowed back to back
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a request may be sent, then take a token."""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RetryBudget:
+    def __init__(self, query, max_retries=10, deadline=None, base_delay=1.0, max_delay=60.0):
+        self.query = query
+        self.max_retries = max_retries  # Consecutive failed attempts allowed on one page
+        self.deadline = deadline  # Seconds the whole call may take, None for no limit
+        self.base_delay = base_delay  # Backoff after the first failure, doubled on each consecutive one
+        self.max_delay = max_delay  # Upper bound of the backoff
+        self.started = time.monotonic()
+        self.failures = 0  # Failed attempts during the whole call, for reporting
+        self.domains_tried = set()
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def check_deadline(self, url, last_status=None):
+        """Raise ScrapeError if the call has run past its deadline."""
+        if self.deadline is not None and self.elapsed() > self.deadline:
+            raise ScrapeError("deadline_exceeded", self.query, url, self.failures, self.elapsed(),
+                              last_status, self.domains_tried)
+
+    def backoff_delay(self, consecutive_failures):
+        """Exponential backoff with "equal jitter": half fixed, half random."""
+        delay = min(self.max_delay, self.base_delay * 2 ** (consecutive_failures - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def failed(self, url, domain, status_code, consecutive_failures):
+        """
+        Account for one failed attempt and sleep before the next one. `consecutive_failures`
+        counts the failures since the caller's last successful page, so scattered transient
+        errors over a long crawl do not add up. Raises ScrapeError when a page has failed more
+        than max_retries times in a row or the deadline would pass while waiting.
+        """
+        self.failures += 1
+        self.domains_tried.add(domain)
+        if consecutive_failures > self.max_retries:
+            raise ScrapeError("retries_exhausted", self.query, url, self.failures, self.elapsed(),
+                              status_code, self.domains_tried)
+
+        delay = self.backoff_delay(consecutive_failures)
+        if self.deadline is not None and self.elapsed() + delay > self.deadline:
+            raise ScrapeError("deadline_exceeded", self.query, url, self.failures, self.elapsed(),
+                              status_code, self.domains_tried)
+        await asyncio.sleep(delay)
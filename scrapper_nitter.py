@@ -4,20 +4,68 @@ Nitter is a free and open source alternative Twitter front-end focused on privac
 """
 
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import quote_plus
 import csv
-from datetime import datetime
+import hashlib
+import os
+import time
+from datetime import datetime, timedelta
 import asyncio
+import httpx
 from playwright.async_api import async_playwright
 
+from nitter_parser import get_parser
+from crawl_checkpoint import CrawlCheckpoint
+from instance_router import InstanceRouter
+from page_cache import PageCache
+from retry_policy import RetryBudget, TokenBucket
+
+# Markers of JS challenges / bot walls served instead of the Nitter search page
+CHALLENGE_MARKERS = (
+    "cf-chl",
+    "challenge-platform",
+    "just a moment",
+    "checking your browser",
+    "verifying you are human",
+    "anubis",
+    "enable javascript",
+)
+
+# Playwright resource types aborted when block_resources is on; the HTML is all we parse
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+
 class ScraperNitter:
-    def __init__(self):
+    def __init__(self, concurrent=False, max_pages_per_domain=2, n_windows=None, http_first=True, cache=True,
+                 parser="auto", html_dump_dir=None, page_timeout=20, rate_per_domain=1.0, burst=3,
+                 max_retries=10, deadline=None, block_resources=True, checkpoint_dir=None, max_pages_ahead=4):
         self.domains = self._get_domains()  # List of available Nitter instances
         self.domain = self.domains[0] if self.domains else "https://nitter.net"
         self.browser = None
         self.context = None
         self.playwright = None
+        self.concurrent = concurrent  # Crawl date sub-windows in parallel across all instances
+        self.max_pages_per_domain = max_pages_per_domain  # Max simultaneous Playwright pages per instance
+        self.n_windows = n_windows  # Number of sub-windows in concurrent mode (default: one per page slot)
+        self.max_pages_ahead = max_pages_ahead  # Pages a sub-window may buffer before it waits for the consumer
+        self._domain_slots = {}  # Semaphore per instance bounding its open pages
+        self.http_first = http_first  # Try a plain HTTP request before opening a browser page
+        self.http_client = None
+        self.fetch_modes = {}  # Per instance: "http" if plain requests work, "browser" if it needs Playwright
+        # Parsed-page cache: True for the default on-disk cache, a PageCache instance, or False/None to disable
+        self.cache = PageCache() if cache is True else (cache or None)
+        self.parser = get_parser(parser)  # HTML parser backend: "auto", "lxml" or "html.parser"
+        self.html_dump_dir = html_dump_dir  # If set, raw search pages are saved here (e.g. for benchmark_parser.py)
+        self.page_timeout = page_timeout  # Seconds before a page request counts as failed
+        self.router = InstanceRouter(self.domains or [self.domain])  # Health-scored instance selection
+        self.rate_per_domain = rate_per_domain  # Requests per second allowed on each instance (token bucket)
+        self.burst = burst  # Requests an instance may receive back to back before the rate applies
+        self._rate_limiters = {}  # Token bucket per instance
+        self.max_retries = max_retries  # Consecutive failed attempts allowed on one page
+        self.deadline = deadline  # Seconds a get_tweets/aiter_pages call may take (None for no limit)
+        self.block_resources = block_resources  # Abort images, media, fonts and CSS requested by browser pages
+        self._page_pool = []  # Idle Playwright pages kept open for reuse
+        # If set, every search window periodically saves its cursor and tweets there so an interrupted crawl can resume
+        self.checkpoint = CrawlCheckpoint(checkpoint_dir) if checkpoint_dir else None
 
 
     async def __aenter__(self):
@@ -25,17 +73,38 @@ class ScraperNitter:
         self.playwright = await async_playwright().start()
         self.browser = await self.playwright.firefox.launch(headless=True)
         self.context = await self.browser.new_context()
+        if self.block_resources:
+            await self.context.route("**/*", self.__route_request)
+        self.http_client = httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            timeout=httpx.Timeout(self.page_timeout, connect=min(10.0, self.page_timeout)),
+            limits=httpx.Limits(
+                max_connections=max(1, len(self.domains or [])) * self.max_pages_per_domain,
+                max_keepalive_connections=max(1, len(self.domains or [])) * self.max_pages_per_domain,
+            ),
+            headers={
+                "User-Agent": await self._browser_user_agent(),
+                "Accept": "text/html,application/xhtml+xml",
+                "Accept-Language": "en-US,en;q=0.5",
+            },
+        )
         return self
 
 
     async def __aexit__(self, exc_type, exc, tb):
         """Close browser and stop Playwright on exit (even if error occurs)."""
+        if self.http_client:
+            await self.http_client.aclose()
+        self._page_pool.clear()  # Closed together with the context
         if self.context:
             await self.context.close()
         if self.browser:
             await self.browser.close()
         if self.playwright:
             await self.playwright.stop()
+        if self.cache:
+            self.cache.close()
 
 
     def _get_domains(self, validated_only: bool = True) -> list[str] | None:
@@ -68,14 +137,38 @@ class ScraperNitter:
         else:
             return None
 
-    def __next_domain(self):
-        """Switch to the next available Nitter instance."""
-        if self.domains:
-            current_index = self.domains.index(self.domain)
-            next_index = (current_index + 1) % len(self.domains)
-            self.domain = self.domains[next_index]
-        else:
-            self.domain = "https://nitter.net"
+    def router_state(self):
+        """Health of every Nitter instance as seen by the router (latency, error rates, circuit breakers)."""
+        return self.router.state()
+
+    def __domain_slot(self, domain):
+        """Semaphore limiting how many pages are open at the same time on one instance."""
+        if domain not in self._domain_slots:
+            self._domain_slots[domain] = asyncio.Semaphore(self.max_pages_per_domain)
+        return self._domain_slots[domain]
+
+    def __rate_limiter(self, domain):
+        """Token bucket spacing out the requests sent to one instance."""
+        if domain not in self._rate_limiters:
+            self._rate_limiters[domain] = TokenBucket(self.rate_per_domain, self.burst)
+        return self._rate_limiters[domain]
+
+    @staticmethod
+    def _split_windows(since, until, n_windows):
+        """
+        Split the [since, until) date range into at most n_windows contiguous
+        sub-windows of whole days, returned newest first.
+        """
+        start = datetime.strptime(since, "%Y-%m-%d").date()
+        end = datetime.strptime(until, "%Y-%m-%d").date()
+        total_days = (end - start).days
+        if total_days <= 1 or n_windows <= 1:
+            return [(since, until)]
+
+        n = min(n_windows, total_days)
+        bounds = [start + timedelta(days=round(i * total_days / n)) for i in range(n + 1)]
+        windows = [(bounds[i].isoformat(), bounds[i + 1].isoformat()) for i in range(n)]
+        return windows[::-1]
 
     def _get_search_url(
         self, query, since="", until="", near="", filters={}, excludes={}):
@@ -114,91 +207,161 @@ class ScraperNitter:
         )
 
     
-    async def __fetch_tweets(self, url, verbose=False):
-        """Fetch page HTML using Playwright."""
+    async def __route_request(self, route):
+        """Abort heavy sub-resources (images, media, fonts, CSS) of browser pages."""
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def __acquire_page(self):
+        """Take an idle page from the pool, or open a new one if none is left."""
+        while self._page_pool:
+            page = self._page_pool.pop()
+            if not page.is_closed():
+                return page
+        return await self.context.new_page()
+
+    async def __release_page(self, page, reusable=True):
+        """Return a page to the pool, or close it if it is broken or the pool is full."""
+        max_idle = max(1, len(self.domains or [])) * self.max_pages_per_domain
+        if reusable and not page.is_closed() and len(self._page_pool) < max_idle:
+            self._page_pool.append(page)
+        elif not page.is_closed():
+            await page.close()
 
-        page = await self.context.new_page()
-        full_url = self.domain + url
+    async def _browser_user_agent(self):
+        """User agent of the Playwright browser, reused by the HTTP client so both paths look alike."""
+        page = await self.__acquire_page()
+        try:
+            return await page.evaluate("navigator.userAgent")
+        finally:
+            await self.__release_page(page)
+
+    @staticmethod
+    def _looks_like_challenge(html, status_code):
+        """Whether a plain HTTP response is a JS challenge or bot wall rather than a Nitter page."""
+        if status_code in (403, 503):
+            return True
+        if status_code != 200:
+            return False
+        lowered = html.lower()
+        if any(marker in lowered for marker in CHALLENGE_MARKERS):
+            return True
+        # A real search page always renders a timeline or an error panel
+        return "timeline" not in lowered and "error-panel" not in lowered
+
+    async def __fetch_http(self, full_url, verbose=False):
+        """Fetch page HTML with the pooled HTTP client."""
+        try:
+            if verbose:
+                print(f"Fetching URL over HTTP: {full_url}")
+            resp = await self.http_client.get(full_url)
+            return resp.text, resp.status_code
+        except httpx.HTTPError as e:
+            print(f"HTTP error on {full_url}: {e}")
+            return "", 500
+
+    async def __fetch_browser(self, full_url, verbose=False):
+        """Fetch page HTML using a pooled Playwright page."""
+        page = await self.__acquire_page()
+        # Only a page that finished loading goes back to the pool: a timed-out, crashed or cancelled
+        # one may still be navigating, so it must not be handed out again
+        reusable = False
         try:
             if verbose:
                 print(f"Fetching URL: {full_url}")
-            resp = await page.goto(full_url, timeout=60000, wait_until="domcontentloaded")
+            resp = await page.goto(full_url, timeout=self.page_timeout * 1000, wait_until="domcontentloaded")
             status_code = resp.status if resp else 500
             html = await page.content()
+            reusable = True
         except Exception as e:
             print(f"Playwright error on {full_url}: {e}")
             html, status_code = "", 500
         finally:
-            await page.close()
+            await self.__release_page(page, reusable)
 
         return html, status_code
 
+    async def __fetch_tweets(self, url, domain=None, verbose=False):
+        """
+        Fetch page HTML, over plain HTTP when the instance allows it and with a
+        Playwright page otherwise. The path that works is remembered per instance.
+        Returns the HTML, the status code and the seconds spent on the request itself
+        (not waiting for a free page slot).
+        """
 
-    def __parse_tweets(self, html_content):
-        """Parses the HTML content to extract tweet information."""
+        domain = domain or self.domain
+        full_url = domain + url
+        async with self.__domain_slot(domain):
+            start_time = time.monotonic()
+            if self.http_first and self.fetch_modes.get(domain) != "browser":
+                html, status_code = await self.__fetch_http(full_url, verbose)
+                if not self._looks_like_challenge(html, status_code):
+                    if status_code == 200:
+                        self.fetch_modes[domain] = "http"
+                    return html, status_code, time.monotonic() - start_time
+                print(f"{domain} answered with a bot wall, using the browser from now on.")
+                self.fetch_modes[domain] = "browser"
 
-        def ts_to_iso8601(ts):
-            dt = datetime.strptime(ts.replace(" ·", ""), "%b %d, %Y %I:%M %p %Z")
-            return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+            html, status_code = await self.__fetch_browser(full_url, verbose)
+            return html, status_code, time.monotonic() - start_time
 
-        soup = BeautifulSoup(html_content, "html.parser")
-        tweets = []
 
-        # If timeline-end for if tweets where found or timeline-none for if no tweets where found
-        if soup.find("h2", class_="timeline-end") or soup.find("h2", class_="timeline-none"):
-            return None, "finished"
-        
-        # If the input is too long, return no tweets and an error message
-        error_div = soup.find("div", class_=lambda c: c and "error-panel" in c)
-        if error_div and "search input too long" in error_div.get_text(strip=True).lower():
-            return None, "exceeded_length"
-
-        for tweet in soup.find_all("div", class_="timeline-item"):
-            tweet_data = {}
-            tweet_body = tweet.find("div", class_="tweet-body")
-            if tweet_body:
-                username = tweet_body.find("a", class_="username")
-                tweet_data["user"] = username.text.strip() if username else ""
-
-                content = tweet_body.find("div", class_="tweet-content")
-                content = content.text.strip().replace("\n", "\\n") if content else ""
-                tweet_data["text"] = f'"{content}"' if content else ""  # Wrap text in quotes to handle commmas in CSV
-
-                timestamp = tweet_body.find("span", class_="tweet-date")
-                tweet_data["created_at_datetime"] = ts_to_iso8601(timestamp.a["title"].strip()) if timestamp and timestamp.a else ""
-
-                link = tweet.find("a", class_="tweet-link")
-                tweet_data["link"] = link["href"] if link and link.has_attr("href") else ""
-                
-                replying_to = tweet_body.find("div", class_="replying-to", recursive=False)
-                tweet_data["replying-to"] = [a.get_text(strip=True) for a in replying_to.find_all('a')] if replying_to else []
-
-                quote = tweet_body.find("div", class_="quote")
-                quote_user = quote.find("a", class_="username") if quote else None
-                tweet_data["quoting"] = quote_user.text.strip() if quote_user else ""
-
-                tweet_stat = tweet_body.find_all("span", class_="tweet-stat")
-                if len(tweet_stat) < 4:
-                    tweet_data["comments"] = 0
-                    tweet_data["retweets"] = 0
-                    tweet_data["quotes"] = 0
-                    tweet_data["likes"] = 0
-                else:
-                    tweet_data["comments"] = int(tweet_stat[0].div.text.strip().replace(",", "")) if tweet_stat[0].div.text.strip() else 0
-                    tweet_data["retweets"] = int(tweet_stat[1].div.text.strip().replace(",", "")) if tweet_stat[1].div.text.strip() else 0
-                    tweet_data["quotes"] = int(tweet_stat[2].div.text.strip().replace(",", "")) if tweet_stat[2].div.text.strip() else 0
-                    tweet_data["likes"] = int(tweet_stat[3].div.text.strip().replace(",", "")) if tweet_stat[3].div.text.strip() else 0
-
-                tweets.append(tweet_data)
-
-        cursor = None
-        show_more = soup.find_all("div", class_="show-more")[-1] if soup.find_all("div", class_="show-more") else None
-        if show_more and show_more.a and show_more.a.has_attr("href"):
-            href = show_more.a["href"]
-            if "&cursor=" in href:
-                cursor = '&cursor=' + href.split("&cursor=")[-1]
-
-        return tweets, cursor
+    async def __fetch_page(self, url, cursor="", domain=None, verbose=False):
+        """
+        Return (tweets, new_cursor, status_code, source) for one search page, served from
+        the page cache when possible (source is then "cache", otherwise the instance).
+        Only complete pages are cached: pages with tweets and the final page of a search.
+        Empty pages usually mean a misbehaving instance. Every network fetch is reported
+        to the router so it can keep track of the instance's health.
+        """
+
+        if self.cache:
+            cached = self.cache.get(url, cursor)
+            if cached is not None:
+                if verbose:
+                    print(f"Cache hit for: {url + cursor}")
+                tweets, new_cursor = cached
+                return tweets, new_cursor, 200, "cache"
+
+        domain = domain or self.domain
+        await self.__rate_limiter(domain).acquire()
+        self.router.start(domain)
+        recorded = False
+        try:
+            html_content, status_code, latency = await self.__fetch_tweets(url + cursor, domain=domain, verbose=verbose)
+            if self.html_dump_dir and status_code == 200 and html_content:
+                self.__dump_html(url + cursor, html_content)
+
+            if self.concurrent:
+                # Keep parsing off the event loop thread while many pages are in flight
+                tweets, new_cursor = await asyncio.to_thread(self.__parse_tweets, html_content)
+            else:
+                tweets, new_cursor = self.__parse_tweets(html_content)
+
+            self.router.record(domain, latency, status_code, n_tweets=len(tweets or []),
+                               finished=new_cursor in ("finished", "exceeded_length"))
+            recorded = True
+        finally:
+            if not recorded:  # Cancelled or failed to parse: release the in-flight slot
+                self.router.finish(domain)
+
+        if self.cache and status_code == 200 and (tweets or new_cursor == "finished"):
+            self.cache.put(url, cursor, tweets, new_cursor)
+
+        return tweets, new_cursor, status_code, domain
+
+    def __dump_html(self, url, html_content):
+        """Save a raw search page to html_dump_dir, named after the hash of its URL."""
+        os.makedirs(self.html_dump_dir, exist_ok=True)
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + ".html"
+        with open(os.path.join(self.html_dump_dir, name), "w", encoding="utf-8") as file:
+            file.write(html_content)
+
+    def __parse_tweets(self, html_content):
+        """Parses the HTML content to extract tweet information (see nitter_parser for the backends)."""
+        return self.parser.parse(html_content)
 
     def __save_tweets_to_csv(self, tweets, filename="tweets.csv"):
         """Saves the list of tweets to a CSV file."""
@@ -224,65 +387,210 @@ class ScraperNitter:
             for tweet in tweets:
                 writer.writerow(tweet)
 
-    async def get_tweets(self, query, since="", until="", near="", filters={}, excludes={}, save_csv=True, verbose=False, filename=None):
+    async def __aiter_window(self, query, url, domain=None, since="", until="", window=0, verbose=False, budget=None):
         """
-        Retrieves tweets based on the search query and parameters, saving them to a CSV file.
+        Follow the cursor chain of one search URL and yield every page with tweets as soon
+        as it is parsed. Each page goes to the instance chosen by the router, staying on
+        `domain` while it is healthy; when no domain is given the scraper's current
+        instance is used and kept up to date.
+        Yields a single page with status "exceeded_length" if the query is too long for Nitter.
+        Failed attempts back off exponentially and are reported to `budget`, which raises
+        ScrapeError once a page has failed max_retries times in a row or the call is past its deadline.
+
+        With checkpointing on, the window's next cursor and tweets are saved every few pages.
+        A later call for the same window first yields the saved tweets as one page with
+        source "checkpoint" and then continues from the saved cursor.
         """
 
-        url = self._get_search_url(query, since, until, near, filters, excludes)
+        follow_current = domain is None
+        domain = domain or self.domain
+        budget = budget or RetryBudget(query, self.max_retries, self.deadline)
         cursor = ""
-        all_tweets = []
+        consecutive_failures = 0
+
+        checkpoint = self.checkpoint
+        pending = []  # Tweets yielded since the last checkpoint save
+        pages_since_save = 0
+        n_saved = 0
+        state = checkpoint.load(url) if checkpoint else None
+        if state:
+            cursor = state["cursor"]
+            n_saved = len(state["tweets"])
+            print(f"Resuming crawl of {since or '...'} to {until or '...'} from checkpoint ({n_saved} tweets).")
+            if state["tweets"]:
+                yield {"status": "ok", "tweets": state["tweets"], "cursor": "", "next_cursor": cursor,
+                       "source": "checkpoint", "since": since, "until": until, "window": window}
 
         while True:
+            budget.check_deadline(url + cursor)
+            domain = self.router.choose(prefer=domain)
             if verbose:
-                print(f"Fetching tweets from: {self.domain + url + cursor}")
-            html_content, status_code = await self.__fetch_tweets(url + cursor)
+                print(f"Fetching tweets from: {domain + url + cursor}")
+            tweets, new_cursor, status_code, source = await self.__fetch_page(url, cursor, domain=domain)
+
+            if new_cursor == "exceeded_length": # Query length exceeded
+                print("\nQuery length exceeded the limit for Nitter (500).")
+                print("\nNumber of characters in the query: ", len(query))
+                if checkpoint:
+                    checkpoint.delete(url)
+                yield {"status": "exceeded_length", "tweets": [], "cursor": cursor, "next_cursor": None,
+                       "source": source, "since": since, "until": until, "window": window}
+                return
 
             if status_code == 200:
-                tweets, new_cursor = self.__parse_tweets(html_content)
-                all_tweets.extend(tweets if tweets else [])
                 if new_cursor == "finished": # No more tweets to fetch
-                    return all_tweets
-                
-                if new_cursor == "exceeded_length": # Query length exceeded
-                    print("\nQuery length exceeded the limit for Nitter (500).")
-                    print("\nNumber of characters in the query: ", len(query))
-                    return "exceeded_length"
-                
-                if len(tweets) == 0: # No tweets found on this page, stop the loop
-                    self.__next_domain() # Switch to the next domain if no tweets found
-                    print(f"No tweets found, switching to next domain: {self.domain}")
-
-                if save_csv:
-                    print("Saving tweets to CSV...")
-                    self.__save_tweets_to_csv(tweets, filename=filename)
-                
+                    if checkpoint:
+                        checkpoint.delete(url)
+                    return
+
+                if tweets:
+                    consecutive_failures = 0
+                    if checkpoint:
+                        pending.extend(dict(tweet) for tweet in tweets)  # Copies, consumers may annotate the yielded dicts
+                        pages_since_save += 1
+                    yield {"status": "ok", "tweets": tweets, "cursor": cursor, "next_cursor": new_cursor,
+                           "source": source, "since": since, "until": until, "window": window}
+                else: # No tweets found on this page
+                    failed_domain, domain = domain, self.router.choose(exclude={domain}) # Switch to another domain if no tweets found
+                    print(f"No tweets found, switching to domain: {domain}")
+                    consecutive_failures += 1
+                    await budget.failed(url + cursor, failed_domain, status_code, consecutive_failures)
+
                 if new_cursor:
                     cursor = new_cursor
+                    if checkpoint and pages_since_save >= checkpoint.every_n_pages:
+                        n_saved += len(pending)
+                        checkpoint.save(url, query, since, until, cursor, pending, n_saved)
+                        pending, pages_since_save = [], 0
+                elif tweets: # Page without a "show more" link, nothing left to follow
+                    if checkpoint:
+                        checkpoint.delete(url)
+                    return
             else:
-                _, new_cursor = self.__parse_tweets(html_content)  # Force switch to next domain
-                if new_cursor == "exceeded_length": # Query length exceeded
-                    print("\nQuery length exceeded the limit for Nitter (500).")
-                    print("\nNumber of characters in the query: ", len(query))
-                    return "exceeded_length"
-                
-                self.__next_domain() # Switch to the next domain if error occurs
-                print(f"Switching to next domain: {self.domain}")
+                failed_domain, domain = domain, self.router.choose(exclude={domain}) # Switch to another domain if error occurs
+                print(f"Switching to domain: {domain}")
+                consecutive_failures += 1
+                await budget.failed(url + cursor, failed_domain, status_code, consecutive_failures)
+
+            if follow_current:
+                self.domain = domain
+
+    async def aiter_pages(self, query, since="", until="", near="", filters={}, excludes={}, verbose=False, concurrent=None):
+        """
+        Async generator yielding each parsed search page as soon as it arrives, as a dict with
+        the page's "tweets", the "cursor" it was fetched with, the "next_cursor", the "source"
+        instance (or "cache"), its window "since"/"until" and a "status" ("ok", or
+        "exceeded_length" when the query is too long for Nitter, after which it stops).
+
+        In concurrent mode the [since, until) range is split into sub-windows that are crawled
+        at the same time, spread over every instance in self.domains with at most
+        max_pages_per_domain open pages per instance. Pages are still yielded newest→oldest:
+        windows are drained newest first while the older ones keep filling in the background,
+        each pausing once it is max_pages_ahead pages ahead, so memory stays bounded.
+
+        Requests are rate limited per instance and failed attempts are retried with backoff.
+        The call raises retry_policy.ScrapeError once a page has failed max_retries times in a
+        row (counted per window, reset by every successful page) or the call (all windows
+        together) has run past its deadline.
+        """
+
+        concurrent = self.concurrent if concurrent is None else concurrent
+        budget = RetryBudget(query, self.max_retries, self.deadline)
+        if not (concurrent and since and until):
+            url = self._get_search_url(query, since, until, near, filters, excludes)
+            async for page in self.__aiter_window(query, url, since=since, until=until, verbose=verbose, budget=budget):
+                yield page
+            return
+
+        domains = self.domains or [self.domain]
+        n_windows = self.n_windows or len(domains) * self.max_pages_per_domain
+        windows = self._split_windows(since, until, n_windows)
+        if verbose:
+            print(f"Crawling {len(windows)} windows concurrently across {len(domains)} instances...")
+
+        queues = [asyncio.Queue(maxsize=self.max_pages_ahead) for _ in windows]
+
+        async def crawl_window(i, w_since, w_until):
+            url = self._get_search_url(query, w_since, w_until, near, filters, excludes)
+            pages = self.__aiter_window(query, url, domains[i % len(domains)], w_since, w_until, i, verbose, budget)
+            try:
+                async for page in pages:
+                    await queues[i].put(page)  # Waits while the window is max_pages_ahead pages ahead
+                await queues[i].put(None) # End of window
+            except Exception as e:
+                await queues[i].put(e)
+            finally:
+                await pages.aclose()  # No end marker when cancelled, the consumer is gone
+
+        tasks = [asyncio.create_task(crawl_window(i, w_since, w_until)) for i, (w_since, w_until) in enumerate(windows)]
+        seen_links = set()
+        try:
+            # Windows are ordered newest first and each one is newest→oldest, so draining them in order keeps the order
+            for queue in queues:
+                while (page := await queue.get()) is not None:
+                    if isinstance(page, Exception):
+                        raise page
+                    if page["status"] == "exceeded_length":
+                        yield page
+                        return
+                    page["tweets"] = [t for t in page["tweets"] if not (t["link"] and t["link"] in seen_links)]
+                    seen_links.update(t["link"] for t in page["tweets"])
+                    yield page
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def iter_tweets(self, query, since="", until="", near="", filters={}, excludes={}, verbose=False, concurrent=None):
+        """Async generator yielding tweets one by one (newest→oldest). Stops early if the query is too long."""
+
+        async for page in self.aiter_pages(query, since, until, near, filters, excludes, verbose, concurrent):
+            if page["status"] == "exceeded_length":
+                return
+            for tweet in page["tweets"]:
+                yield tweet
+
+    async def get_tweets(self, query, since="", until="", near="", filters={}, excludes={}, save_csv=True, verbose=False, filename=None,
+                         concurrent=None):
+        """
+        Retrieves tweets based on the search query and parameters, saving them to a CSV file.
+        Thin wrapper around aiter_pages that collects every page; see there for concurrent mode.
+        """
+
+        all_tweets = []
+        async for page in self.aiter_pages(query, since, until, near, filters, excludes, verbose, concurrent):
+            if page["status"] == "exceeded_length":
+                return "exceeded_length"
+
+            all_tweets.extend(page["tweets"])
+            if save_csv:
+                print("Saving tweets to CSV...")
+                self.__save_tweets_to_csv(page["tweets"], filename=filename)
+
+        return all_tweets
             
-    async def check_tweets_exist(self, query, since="", until="", near="", filters={}, excludes={}):
-        """Check if there are any tweets matching the search query and parameters."""
+    async def check_tweets_exist(self, query, since="", until="", near="", filters={}, excludes={}, retries=3):
+        """
+        Check if there are any tweets matching the search query and parameters.
+        Only a page with tweets (True) or the end of the timeline (False) is a definite
+        answer; errors and empty pages are retried on other instances, with backoff, up to
+        `retries` times before giving up with None (unknown).
+        """
 
         url = self._get_search_url(query, since, until, near, filters, excludes)
-        html_content, status_code = await self.__fetch_tweets(url)
-
-        if status_code == 200:
-            tweets, _ = self.__parse_tweets(html_content)
-            if tweets:
-                return True
-            else:
-                return False
-        else:
-            return False
+        budget = RetryBudget(query, retries, self.deadline)
+        domain = None
+        for attempt in range(retries + 1):
+            domain = self.router.choose(prefer=domain)
+            tweets, new_cursor, status_code, _ = await self.__fetch_page(url, domain=domain)
+            if status_code == 200 and (tweets or new_cursor in ("finished", "exceeded_length")):
+                return bool(tweets)
+            domain = self.router.choose(exclude={domain})
+            if attempt < retries:
+                await asyncio.sleep(budget.backoff_delay(attempt + 1))
+
+        print(f"Could not tell whether tweets exist from {since or '...'} to {until or '...'}.")
+        return None
             
     async def check_availability(self, all=False):
         """
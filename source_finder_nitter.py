@@ -17,24 +17,40 @@ in other areas as well.
 '''
 
 import time
-from datetime import date
+from datetime import date, timedelta
 from collections import Counter
 import asyncio
+import functools
 import os
 import pandas as pd
 from datetime import date as _date
 
 from scrapper_nitter import ScraperNitter
 from query_generator import QueryGenerator
-from alignment import AlignmentModel
+from model_registry import DEFAULT_ALIGNMENT_MODEL, get_alignment_model, get_cascade_model
+from prefilter import EmbeddingPrefilter
+from dedup import DuplicateIndex
 from query_builder_synonyms import SynonymQueryBuilder
 
+# Columns of the class probabilities in the find_all CSV, in the order of AlignmentModel.labels
+PROB_COLUMNS = ["prob_entailment", "prob_neutral", "prob_contradiction"]
+
 
 class SourceFinder:
-    def __init__(self, max_keywords=5, n_keywords_dropped=2, excludes={"nativeretweets", "replies"}):
+    def __init__(self, max_keywords=5, n_keywords_dropped=2, excludes={"nativeretweets", "replies"}, executor=None,
+                 prefilter_threshold=None, dedup_threshold=None, inference=None, nli_model=DEFAULT_ALIGNMENT_MODEL,
+                 screen_model=None, screen_confidence=0.9):
         self.max_keywords = max_keywords # Maximum number of keywords extracted by KeyBert
         self.n_keywords_dropped = n_keywords_dropped # Number of keywords dropped per clause
         self.excludes = excludes
+        self.executor = executor # Pool for CPU-heavy stages (KeyBERT, spaCy, NLI), None for asyncio's default
+        self.prefilter_threshold = prefilter_threshold # Cosine similarity a tweet needs to reach NLI, None to classify all
+        self.prefilter = None # Created with the first window, so the embedding model loads off the event loop
+        self.dedup_threshold = dedup_threshold # Jaccard similarity at which tweets count as near-duplicates (e.g. 0.9), None to classify every copy
+        self.inference = inference # Shared InferenceServer batching windows across requests, None to call the model directly
+        self.nli_model = nli_model # NLI model name or alias in alignment.NLI_MODELS (the inference server has its own)
+        self.screen_model = screen_model # Small NLI model screening tweets for nli_model (two-stage cascade), None for nli_model only
+        self.screen_confidence = screen_confidence # Screen probability below which a tweet is escalated to nli_model
     
 
     @staticmethod
@@ -73,11 +89,209 @@ class SourceFinder:
             self.print_tweet_with_alignment(tweets[i])
 
 
+    def _load_alignment_model(self):
+        """The shared nli_model, or a screen_model -> nli_model cascade when a screen model is set."""
+        if self.screen_model:
+            return get_cascade_model(self.screen_model, self.nli_model, self.screen_confidence)
+        return get_alignment_model(self.nli_model)
+
+    async def _run_cpu(self, fn, *args, **kwargs):
+        """Run a CPU-heavy call (model loading, keyword extraction, inference) in the executor, off the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    def _build_query(self, claim, synonyms, dev_mode, keywords, model_name, top_n_syns, threshold, max_syns_per_kw, user_choices):
+        """Extract the keywords of the claim and build the advanced-search query. Returns (query, keywords)."""
+        if synonyms:
+            query_builder = SynonymQueryBuilder(
+                sentence=claim,
+                max_keywords=self.max_keywords,
+                n_keywords_dropped=self.n_keywords_dropped,
+                model_name=model_name,
+                top_n_syns=top_n_syns,
+                threshold=threshold,
+                max_syns_per_kw=max_syns_per_kw,
+                keywords=keywords
+            )
+
+            # TODO: introduce DEV_MODE and explain below
+            if dev_mode:
+                keywords = query_builder.keywords
+                query = query_builder.run()
+            else:
+                query = query_builder.build_boolean_query(user_choices)
+        else:
+            query_generator = QueryGenerator(claim)
+            keywords = query_generator.extract_keywords(max_keywords=self.max_keywords)
+            query = query_generator.build_query(
+                n_keywords_dropped=self.n_keywords_dropped,
+                keywords=keywords
+            )
+
+        print(f"\nGenerated Boolean Query:\n{query}\n")
+        return query, keywords
+
+    async def _aiter_classified_pages(self, scraper, alignment_model, claim, query, since="", until="", verbose=False,
+                                      max_queue=4, dedup_index=None):
+        """
+        Pipelined scrape→classify: yields the pages of aiter_pages with an "alignment" label and
+        class "probs" on every tweet. A producer task keeps scraping into a bounded asyncio queue while the
+        previous page is classified in an executor thread, so network and inference overlap.
+        When inference falls behind, the full queue (max_queue pages) pauses the scraper.
+        A page with status "exceeded_length" is yielded as is and ends the iteration.
+        With a dedup_threshold, near-duplicates are grouped across all pages of the crawl (in
+        dedup_index if given), so copies on later pages reuse the label of the first one.
+        """
+        queue = asyncio.Queue(maxsize=max_queue)
+        dedup_index = dedup_index or self._dedup_index()
+
+        async def produce():
+            pages = scraper.aiter_pages(query=query, since=since, until=until, excludes=self.excludes, verbose=verbose)
+            try:
+                async for page in pages:
+                    await queue.put(page)  # Blocks while the queue is full (backpressure)
+                await queue.put(None)  # End of crawl
+            except Exception as e:
+                await queue.put(e)  # Re-raised by the consumer (e.g. ScrapeError)
+            finally:
+                # Also when cancelled by a consumer that stopped early: close the crawl so its window
+                # tasks and browser pages do not outlive it. No end marker then, nobody is waiting.
+                await pages.aclose()
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (page := await queue.get()) is not None:
+                if isinstance(page, Exception):
+                    raise page
+                if page["status"] == "exceeded_length":
+                    yield page
+                    return
+
+                await self._label_window(alignment_model, claim, page["tweets"], dedup_index)
+                yield page
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+
+    async def _prefiltered(self, claim, tweets):
+        """
+        With a prefilter_threshold, drop the tweets whose embedding is not similar enough to the
+        claim (they are labeled NEUTRAL, see prefilter.py) and return the ones that still need NLI.
+        """
+        if self.prefilter_threshold is None or not tweets:
+            return tweets
+        if self.prefilter is None:
+            self.prefilter = await self._run_cpu(EmbeddingPrefilter, self.prefilter_threshold)
+        candidates, skipped = await self._run_cpu(self.prefilter.split, claim, tweets)
+        if skipped:
+            print(f"Prefilter skipped {len(skipped)} of {len(tweets)} tweets (cosine similarity < {self.prefilter_threshold}).")
+        return candidates
+
+    def _dedup_index(self):
+        """A new DuplicateIndex for one window or crawl, None when near-duplicates are not collapsed."""
+        return DuplicateIndex(self.dedup_threshold) if self.dedup_threshold is not None else None
+
+    async def _representatives(self, tweets, dedup_index=None):
+        """
+        With a dedup_threshold, add the tweets to dedup_index (a new one if not given), which groups
+        them with the near-duplicates seen before in the same window or crawl (see dedup.py). Returns
+        the unlabeled representatives of their groups (the first member added), in the order the
+        groups appear in `tweets`, together with the groups. Every member keeps its own timestamp and
+        gets "duplicates" (size of its group so far) and "duplicate_of" (link of the representative),
+        which makes copy-paste campaigns visible.
+        """
+        dedup_index = dedup_index or self._dedup_index()
+        if dedup_index is None or not tweets:
+            return tweets, None
+        group_ids = await self._run_cpu(dedup_index.add, [t["text"] for t in tweets], tweets)
+        groups = [dedup_index.groups[group_id] for group_id in dict.fromkeys(group_ids)]
+        for group in groups:
+            for member in group:
+                member["duplicates"] = len(group)
+                member["duplicate_of"] = group[0].get("link", "")
+        representatives = [group[0] for group in groups if "alignment" not in group[0]]
+        if len(representatives) < len(tweets):
+            print(f"{len(tweets)} new tweets fall into {len(groups)} groups of near-duplicates, {len(representatives)} "
+                  f"to classify (largest: {max(len(group) for group in groups)} copies).")
+        return representatives, groups
+
+    @staticmethod
+    def _copy_to_duplicates(groups):
+        """Give every member of a group the label of its representative, once that is labeled."""
+        for group in groups or []:
+            representative = group[0]
+            if "alignment" not in representative:
+                continue
+            for member in group[1:]:
+                for key in ("alignment", "probs", "similarity", "prefiltered"):
+                    if key in representative:
+                        member[key] = representative[key]
+
+    @staticmethod
+    def _tweets_frame(tweets):
+        """
+        DataFrame of labeled tweets for the find_all CSV. The class "probs" are split into one
+        column per label (empty for tweets skipped by the prefilter), so they survive the CSV.
+        """
+        df = pd.DataFrame(tweets)
+        if "similarity" in df.columns:  # Prefilter on: only skipped tweets carry "prefiltered"
+            df["prefiltered"] = df["prefiltered"].fillna(False).astype(bool) if "prefiltered" in df.columns else False
+        if "probs" in df.columns:
+            probs = [p if p is not None else [None] * len(PROB_COLUMNS) for p in df.pop("probs")]
+            df[PROB_COLUMNS] = pd.DataFrame(probs, index=df.index, columns=PROB_COLUMNS)
+        return df
+
+    async def _label_window(self, alignment_model, claim, tweets, dedup_index=None):
+        """
+        Label the tweets that have no "alignment" yet in one batched pass, attaching the label and
+        the class "probs" to each tweet. Tweets are never classified twice, so the earliest_k
+        buffer, source detection and the aligned batch can all share these labels. Only one tweet
+        per group of near-duplicates (in dedup_index, which spans the window or crawl) is classified.
+        """
+        representatives, groups = await self._representatives([t for t in tweets if "alignment" not in t], dedup_index)
+        unlabeled = await self._prefiltered(claim, representatives)
+        if unlabeled:
+            if self.inference is not None:  # Batched together with the windows of concurrent requests
+                labels, probs = await self.inference.batch_predict_proba(claim, unlabeled)
+            else:
+                labels, probs = await self._run_cpu(alignment_model.batch_predict_proba, claim, unlabeled)
+            for tweet, label, label_probs in zip(unlabeled, labels, probs):
+                tweet["alignment"] = label
+                tweet["probs"] = label_probs
+        self._copy_to_duplicates(groups)
+        return tweets
+
+    async def _classify_until_entailing(self, alignment_model, claim, tweets, dedup_index=None):
+        """
+        Early-exit labeling of an oldest→newest window: the tweets without an "alignment" are
+        classified in order, a few batches at a time, until the first entailing one. Tweets after
+        it are left unlabeled. Returns the entailing tweets among the labeled ones.
+        """
+        representatives, groups = await self._representatives([t for t in tweets if "alignment" not in t], dedup_index)
+        unlabeled = await self._prefiltered(claim, representatives)
+        if self.inference is not None:  # Same chunking as find_first_entailing, batched with concurrent requests
+            labels, probs = [], []
+            chunk_size = alignment_model.batch_size * 2
+            for start in range(0, len(unlabeled), chunk_size):
+                chunk_labels, chunk_probs = await self.inference.batch_predict_proba(claim, unlabeled[start:start + chunk_size])
+                labels.extend(chunk_labels)
+                probs.extend(chunk_probs)
+                if any(alignment_model.labels[label] == 'ENTAILMENT' for label in chunk_labels):
+                    break
+        else:
+            _, labels, probs = await self._run_cpu(alignment_model.find_first_entailing, claim, unlabeled)
+        for tweet, label, label_probs in zip(unlabeled, labels, probs):
+            tweet["alignment"] = label
+            tweet["probs"] = label_probs
+        self._copy_to_duplicates(groups)
+        print(f"Early exit: classified {len(labels)} of {len(unlabeled)} tweets.")
+        return [t for t in tweets if t.get("alignment") == 0]
+
     def predict_alignment(self, claim, tweets_list, filename):
         """
         Saves the tweets along with their alignment to a CSV file.
         """
-        alignment_model = AlignmentModel()
+        alignment_model = self._load_alignment_model()
         print(f"Predicting alignment for {len(tweets_list)} tweets...")
         alignment_list = alignment_model.batch_predict(claim, tweets_list)
 
@@ -97,35 +311,20 @@ class SourceFinder:
     
 
     async def find_all(self, claim, initial_date="", final_date="", verbose=False, synonyms=False, dev_mode=False, keywords=None,
-                       model_name="en_core_web_md", top_n_syns=5, threshold=0.1, max_syns_per_kw=2, data_dir="data/", user_choices=None):
+                       model_name="en_core_web_md", top_n_syns=5, threshold=0.1, max_syns_per_kw=2, data_dir="data/", user_choices=None,
+                       concurrent=True, resume=True, pipelined=True):
         """
         Transforms a claim into a query for advanced search, retrieves tweets using Nitter, selects the
         tweets that align with the original claim, and obtains the oldest.
+        With concurrent=True the date range is crawled in parallel sub-windows across all Nitter instances.
+        With resume=True the crawl checkpoints its progress under data_dir/checkpoints, and a rerun after
+        an interruption continues from the last saved cursor instead of page one.
+        With pipelined=True pages are classified in a worker thread while the crawl continues.
+        Besides the "alignment" label, the CSV and the returned DataFrame hold the class probabilities
+        (PROB_COLUMNS) and, when enabled, the prefilter "similarity"/"prefiltered" and dedup columns.
         """
-        if synonyms:
-            query_builder = SynonymQueryBuilder(
-                sentence=claim, 
-                max_keywords=self.max_keywords, 
-                n_keywords_dropped=self.n_keywords_dropped,
-                model_name=model_name,
-                top_n_syns=top_n_syns,
-                threshold=threshold,
-                max_syns_per_kw=max_syns_per_kw,
-                keywords=keywords
-            )
-
-            # TODO: introduce dev_mode and explain below
-            if dev_mode:
-                keywords = query_builder.keywords
-                query = query_builder.run()
-            else:
-                query = query_builder.build_boolean_query(user_choices or {})
-        else:
-            query_generator = QueryGenerator(claim)
-            keywords = query_generator.extract_keywords(max_keywords=self.max_keywords)
-            query = query_generator.build_query(n_keywords_dropped=self.n_keywords_dropped, keywords=keywords)
-
-        print(f"\nGenerated Boolean Query:\n{query}\n")
+        query, keywords = await self._run_cpu(self._build_query, claim, synonyms, dev_mode, keywords, model_name, top_n_syns,
+                                              threshold, max_syns_per_kw, user_choices or {})
 
         if initial_date == "":
             initial_date = "2006-03-21" # Beginning of Twitter
@@ -145,31 +344,66 @@ class SourceFinder:
             print(f"\nFile {filename} already exists.\n")
             return filename, None   
         
-        async with ScraperNitter() as scraper:
-            tweets_list = await scraper.get_tweets(
-                query=query, 
-                since=initial_date, 
-                until=final_date, 
-                save_csv=False,
-                excludes=self.excludes, 
-                verbose=verbose,
-                filename=filename)
-            
-            if tweets_list == "exceeded_length":
-                return None, None
-        
-            if tweets_list:
-                print(f"\nScraping completed. Found {len(tweets_list)} tweets.\n")
-                tweets_list = self.predict_alignment(claim, tweets_list, filename)
-                df = pd.DataFrame(tweets_list)
-
-                return filename, df
+        # Pages are classified and appended while the crawl is still running. They go to a
+        # partial file first so an interrupted run is not mistaken for a finished one above.
+        partial_filename = filename + ".part"
+        if os.path.exists(partial_filename):
+            os.remove(partial_filename)
+
+        alignment_model = await self._run_cpu(self._load_alignment_model)
+        n_tweets = 0
+        columns = None  # CSV header, fixed by the first page so appended pages line up
+        dedup_index = self._dedup_index()  # Near-duplicates are grouped over the whole crawl
+
+        checkpoint_dir = os.path.join(data_dir, "checkpoints") if resume else None
+        async with ScraperNitter(concurrent=concurrent, checkpoint_dir=checkpoint_dir) as scraper:
+            if pipelined:
+                pages = self._aiter_classified_pages(scraper, alignment_model, claim, query, initial_date, final_date, verbose,
+                                                     dedup_index=dedup_index)
             else:
-                print(f"\nNo tweets were found.\n")
-                return None, None
+                pages = scraper.aiter_pages(
+                    query=query,
+                    since=initial_date,
+                    until=final_date,
+                    excludes=self.excludes,
+                    verbose=verbose)
+
+            async for page in pages:
+                if page["status"] == "exceeded_length":
+                    if os.path.exists(partial_filename):
+                        os.remove(partial_filename)
+                    return None, None
+
+                tweets = page["tweets"]
+                if not pipelined:
+                    await self._label_window(alignment_model, claim, tweets, dedup_index)
+
+                df = self._tweets_frame(tweets)
+                columns = columns or list(df.columns)
+                df.reindex(columns=columns).to_csv(partial_filename, mode="a", header=(n_tweets == 0), index=False,
+                                                   encoding='utf-8')
+                n_tweets += len(tweets)
+                if verbose:
+                    print(f"{n_tweets} tweets classified and saved so far (last page from {page['source']}).")
+
+        if n_tweets == 0:
+            print(f"\nNo tweets were found.\n")
+            return None, None
+
+        os.replace(partial_filename, filename)
+        print(f"\nScraping completed. Found {n_tweets} tweets.\n")
+        print(f"Tweets with alignment saved to {filename}.")
+        df = pd.read_csv(filename, encoding='utf-8')
+        if "duplicate_of" in df.columns:
+            # Pages were saved as they came, before copies on later pages joined their groups
+            df["duplicates"] = df.groupby("duplicate_of", dropna=False)["duplicate_of"].transform("size")
+            df.to_csv(filename, index=False, encoding='utf-8')
+
+        return filename, df
 
     async def find_source(self, claim, initial_date="", final_date="", step=1, synonyms=True,  dev_mode=False, keywords=None,
-                          model_name="en_core_web_md", top_n_syns=5, threshold=0.1, max_syns_per_kw=2, user_choices=None, earliest_k: int = 0):
+                          model_name="en_core_web_md", top_n_syns=5, threshold=0.1, max_syns_per_kw=2, user_choices=None, earliest_k: int = 0,
+                          search="linear", pipelined=True, early_exit=False):
         """
         Find the earliest entailing tweet ('source').
         Additionally, if earliest_k > 0, also collect up to earliest_k earliest tweets
@@ -177,42 +411,30 @@ class SourceFinder:
         newest→oldest, so we simply reverse() each batch to get oldest→newest.
 
         NEW: even after the source is found, keep scanning forward until earliest_buf is full.
-        """
 
-        if synonyms:
-            query_builder = SynonymQueryBuilder(
-                sentence=claim,
-                max_keywords=self.max_keywords,
-                n_keywords_dropped=self.n_keywords_dropped,
-                model_name=model_name,
-                top_n_syns=top_n_syns,
-                threshold=threshold,
-                max_syns_per_kw=max_syns_per_kw,
-                keywords=keywords
-            )
+        search="bisect" uses find_source_bisect instead of scanning every `step`-year window.
+        With pipelined=True each window is classified page by page while it is still being scraped,
+        until the source is found; later windows are only fetched to fill earliest_buf.
+        With early_exit=True each window is instead fetched completely and classified oldest-first,
+        stopping at the first entailing tweet; the returned aligned batch then only holds the
+        entailing tweets classified up to that point.
+        """
 
-            # TODO: introduce DEV_MODE and explain below
-            if dev_mode:
-                keywords = query_builder.keywords
-                query = query_builder.run()
-            else:
-                query = query_builder.build_boolean_query(user_choices)
-        else:
-            query_generator = QueryGenerator(claim)
-            keywords = query_generator.extract_keywords(max_keywords=self.max_keywords)
-            query = query_generator.build_query(
-                n_keywords_dropped=self.n_keywords_dropped,
-                keywords=keywords
-            )
+        if search == "bisect":
+            return await self.find_source_bisect(
+                claim, initial_date, final_date, synonyms=synonyms, dev_mode=dev_mode, keywords=keywords,
+                model_name=model_name, top_n_syns=top_n_syns, threshold=threshold, max_syns_per_kw=max_syns_per_kw,
+                user_choices=user_choices, earliest_k=earliest_k, early_exit=early_exit)
 
-        print(f"\nGenerated Boolean Query:\n{query}\n")
+        query, keywords = await self._run_cpu(self._build_query, claim, synonyms, dev_mode, keywords, model_name,
+                                              top_n_syns, threshold, max_syns_per_kw, user_choices)
 
         if initial_date == "":
             initial_date = "2006-03-21" # Beginning of Twitter
         if final_date == "":
             final_date = _date.today().strftime("%Y-%m-%d")
 
-        alignment_model = AlignmentModel()
+        alignment_model = await self._run_cpu(self._load_alignment_model)
         earliest_buf: list[dict] = []
 
         # var to store src bc don't want to ret immediately
@@ -236,14 +458,26 @@ class SourceFinder:
                 since = f"{start_y}{initial_date[4:]}"
                 until = f"{end_y}{initial_date[4:]}"
                 print(f"\nRetrieving tweets from {since} to {until}...")
-
-                tweets = await scraper.get_tweets(
-                    query=query,
-                    since=since,
-                    until=until,
-                    excludes=self.excludes,
-                    save_csv=False
-                )
+                dedup_index = self._dedup_index()  # Near-duplicates are grouped over the whole window
+
+                # Pages arrive newest first, so early exit needs the whole window. Once the source is
+                # known, only the earliest tweets of the window are labeled, so it is not pipelined.
+                if pipelined and not early_exit and source_tweet is None:
+                    tweets = []
+                    async for page in self._aiter_classified_pages(scraper, alignment_model, claim, query, since, until,
+                                                                   dedup_index=dedup_index):
+                        if page["status"] == "exceeded_length":
+                            tweets = "exceeded_length"
+                            break
+                        tweets.extend(page["tweets"])
+                else:
+                    tweets = await scraper.get_tweets(
+                        query=query,
+                        since=since,
+                        until=until,
+                        excludes=self.excludes,
+                        save_csv=False
+                    )
 
                 if tweets == "exceeded_length":
                     if earliest_k > 0:
@@ -262,17 +496,17 @@ class SourceFinder:
 
                 tweets.reverse()
 
+                # Label the window once (pipelined windows already are, this is then a no-op). Once the
+                # source is known (or with early_exit) only the tweets still needed for the earliest_k
+                # buffer are labeled here.
+                need = max(0, earliest_k - len(earliest_buf))
+                await self._label_window(alignment_model, claim,
+                                         tweets if source_tweet is None and not early_exit else tweets[:need], dedup_index)
+
                 # as long as buffer is not full
-                if earliest_k > 0 and len(earliest_buf) < earliest_k:
-                    need = earliest_k - len(earliest_buf)
+                if need > 0:
                     # take as many as needed to fill buffer only
                     take = tweets[:need]
-
-                    # label whats been taken
-                    labels = alignment_model.batch_predict(claim, take)
-                    for tw, lab in zip(take, labels):
-                        tw["alignment"] = lab
-
                     earliest_buf.extend(take)
 
                     # if src hasnt been found yet, check for entailments
@@ -282,16 +516,18 @@ class SourceFinder:
                             source_tweet = entailing_now[0]  # take the earliest in this slice
                             source_tweet["is_source"] = True
                             source_tweet["side"] = "source"
+                            if not early_exit:
+                                source_aligned_batch = [t for t in tweets if t["alignment"] == 0]
                             print("\nOldest aligned tweet found (from earliest slice):")
                             self.print_tweet(source_tweet)
 
                 # do normal src finding once buffer is full
                 if source_tweet is None:
                     print("None of the earliest slice entails (or buffer not full yet). Checking alignment on full batch...")
-                    aligned_tweets = alignment_model.batch_filter_tweets(
-                        claim,
-                        tweets
-                    )
+                    if early_exit:
+                        aligned_tweets = await self._classify_until_entailing(alignment_model, claim, tweets, dedup_index)
+                    else:
+                        aligned_tweets = [t for t in tweets if alignment_model.labels[t["alignment"]] == 'ENTAILMENT']
                     if aligned_tweets:
                         found_here = alignment_model.find_first(aligned_tweets)
                         found_here["is_source"] = True
@@ -322,6 +558,130 @@ class SourceFinder:
         #     return source_tweet, (source_aligned_batch or [source_tweet])
 
 
+    async def find_source_bisect(self, claim, initial_date="", final_date="", synonyms=True, dev_mode=False, keywords=None,
+                                 model_name="en_core_web_md", top_n_syns=5, threshold=0.1, max_syns_per_kw=2, user_choices=None,
+                                 earliest_k: int = 0, min_window_days=30, early_exit=False):
+        """
+        Find the earliest entailing tweet by bisecting the date range with cheap existence probes.
+
+        First, check_tweets_exist is used to narrow [initial_date, final_date) down to the earliest
+        window of at most min_window_days that contains any tweet. Then only the windows from that
+        boundary onwards are fully fetched and classified (oldest→newest), each window twice as long
+        as the previous one, until an entailing tweet is found (and earliest_buf is full if
+        earliest_k > 0). This takes a logarithmic number of probes instead of scanning every window.
+        A probe that cannot reach any instance gives no answer; bisection then stops and the windows
+        are fetched from the last boundary known to have no tweets before it, so a failed probe never
+        skips a range.
+
+        With early_exit=True a window is only classified up to its first entailing tweet (plus the
+        tweets needed for earliest_buf), see find_source.
+
+        Returns (source_tweet, aligned_batch, earliest_buf); source_tweet and aligned_batch are None
+        when no entailing tweet is found.
+        """
+
+        query, keywords = await self._run_cpu(self._build_query, claim, synonyms, dev_mode, keywords, model_name,
+                                              top_n_syns, threshold, max_syns_per_kw, user_choices)
+
+        if initial_date == "":
+            initial_date = "2006-03-21" # Beginning of Twitter
+        if final_date == "":
+            final_date = _date.today().strftime("%Y-%m-%d")
+
+        start = _date.fromisoformat(initial_date)
+        end = _date.fromisoformat(final_date)
+
+        earliest_buf: list[dict] = []
+        source_tweet = None
+        source_aligned_batch = None
+
+        async with ScraperNitter() as scraper:
+            async def exists(since, until):
+                return await scraper.check_tweets_exist(
+                    query=query, since=since.isoformat(), until=until.isoformat(), excludes=self.excludes)
+
+            n_probes = 1
+            found = await exists(start, end)
+            if found is False:
+                print("\nNo tweets were found between the dates provided.\n")
+                return None, None, earliest_buf
+
+            # Invariant: [start, hi) contains tweets and [start, lo) does not
+            lo, hi = start, end
+            while found is not None and (hi - lo).days > min_window_days:
+                mid = lo + (hi - lo) // 2
+                n_probes += 1
+                found = await exists(start, mid)
+                if found:
+                    hi = mid
+                elif found is False:
+                    lo = mid
+            if found is None:  # Unknown: only [start, lo) is known to be empty, scan on from lo
+                print(f"\nA probe failed, scanning windows from {lo} on ({n_probes} probes).")
+                hi = lo
+            else:
+                print(f"\nEarliest tweets lie between {lo} and {hi} ({n_probes} probes).")
+
+            alignment_model = await self._run_cpu(self._load_alignment_model)
+            since, width = lo, max(min_window_days, (hi - lo).days)
+            while since < end:
+                until = min(end, since + timedelta(days=width))
+                print(f"\nRetrieving tweets from {since} to {until}...")
+                dedup_index = self._dedup_index()  # Near-duplicates are grouped over the whole window
+
+                tweets = await scraper.get_tweets(
+                    query=query,
+                    since=since.isoformat(),
+                    until=until.isoformat(),
+                    excludes=self.excludes,
+                    save_csv=False
+                )
+
+                if tweets == "exceeded_length":
+                    return None, None, None
+
+                if tweets:
+                    print(f"{len(tweets)} tweets were found.")
+                    tweets.reverse()
+
+                    # Label the window once: all of it while the source is unknown, otherwise (and with
+                    # early_exit) only the earliest_buf slice, plus with early_exit the tweets up to the
+                    # first entailing one
+                    need = max(0, earliest_k - len(earliest_buf))
+                    await self._label_window(alignment_model, claim,
+                                             tweets if source_tweet is None and not early_exit else tweets[:need], dedup_index)
+                    if early_exit and source_tweet is None:
+                        await self._classify_until_entailing(alignment_model, claim, tweets, dedup_index)
+
+                    if earliest_k > 0 and len(earliest_buf) < earliest_k:
+                        earliest_buf.extend(tweets[:earliest_k - len(earliest_buf)])
+
+                    if source_tweet is None:
+                        aligned_tweets = [t for t in tweets if t.get("alignment") == 0]
+                        if aligned_tweets:
+                            source_tweet = aligned_tweets[0]
+                            source_tweet["is_source"] = True
+                            source_tweet["side"] = "source"
+                            source_aligned_batch = aligned_tweets
+                            print("\nOldest aligned tweet:")
+                            self.print_tweet(source_tweet)
+                        else:
+                            print("None of the tweets found are aligned with the original claim.")
+                else:
+                    print("No tweets were found.")
+
+                if source_tweet is not None and len(earliest_buf) >= earliest_k:
+                    break
+
+                # Widen the next window
+                since, width = until, width * 2
+
+        if source_tweet is None:
+            print("\nNo aligned tweets were found between the dates provided.\n")
+            return None, None, earliest_buf
+
+        return source_tweet, source_aligned_batch, earliest_buf
+
     async def find_source_high_volume(self, claim, initial_date="", final_date="", step_years=1, synonyms=True, dev_mode=False,
                                      model_name="en_core_web_md", top_n_syns=5, threshold=0.1, max_syns_per_kw=2, user_choices=None):
         """
@@ -330,24 +690,8 @@ class SourceFinder:
         If tweets exist, it retrieves tweets month by month and checks alignment.
         Stops immediately when aligned tweets are found; otherwise moves to next year range.
         """
-        if synonyms:
-            query_builder = SynonymQueryBuilder(
-                sentence=claim, 
-                max_keywords=self.max_keywords, 
-                n_keywords_dropped=self.n_keywords_dropped,
-                model_name=model_name,
-                top_n_syns=top_n_syns,
-                threshold=threshold,
-                max_syns_per_kw=max_syns_per_kw
-            )
-
-            query = query_builder.run()
-        else:
-            query_generator = QueryGenerator(claim)
-            keywords = query_generator.extract_keywords(max_keywords=self.max_keywords)
-            query = query_generator.build_query(n_keywords_dropped=self.n_keywords_dropped, keywords=keywords)
-
-        print(f"\nGenerated Boolean Query:\n{query}\n")
+        query, _ = await self._run_cpu(self._build_query, claim, synonyms, True, None, model_name, top_n_syns,
+                                       threshold, max_syns_per_kw, None)
 
         if initial_date == "":
             initial_date = "2006-03-21"  # Beginning of Twitter
@@ -362,7 +706,7 @@ class SourceFinder:
         prov_initial_year = initial_year
         prov_final_year = initial_year + step_years
 
-        alignment_model = AlignmentModel()
+        alignment_model = await self._run_cpu(self._load_alignment_model)
 
         async with ScraperNitter() as scraper:
             # Loop over each year range
@@ -380,13 +724,13 @@ class SourceFinder:
                     excludes=self.excludes,
                 )
 
-                if not tweets_found:
+                if tweets_found is False:  # None (probe failed) falls through to the month-by-month search
                     print("No tweets found in this year range.")
                     prov_initial_year += step_years
                     prov_final_year += step_years
                     continue
 
-                print("Tweets exist. Checking month by month...")
+                print("Tweets exist. Checking month by month..." if tweets_found else "Checking month by month...")
 
                 # Loop month by month in this year range
                 current_year = prov_initial_year
@@ -422,7 +766,8 @@ class SourceFinder:
                     print(f"    Found {len(month_tweets)} tweets. Checking alignment...")
 
                     # Check alignment immediately
-                    aligned_tweets = alignment_model.batch_filter_tweets(
+                    aligned_tweets = await self._run_cpu(
+                        alignment_model.batch_filter_tweets,
                         claim,
                         month_tweets
                     )